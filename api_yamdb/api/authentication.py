@@ -0,0 +1,46 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from reviews.models import UserRole
+from .tokens import USER_CLAIMS
+
+
+def authenticate_from_db(function):
+    """Marks a viewset action whose requests load the user row."""
+    function.authenticate_from_db = True
+    return function
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Builds request.user from token claims without touching the DB.
+
+    Writes, tokens with elevated rights and viewset actions marked with
+    ``authenticate_from_db`` still load the user row, so a deleted,
+    deactivated or demoted account loses access immediately.
+    """
+
+    def authenticate(self, request):
+        view = (request.parser_context or {}).get('view')
+        handler = getattr(view, getattr(view, 'action', None) or '', None)
+        self.check_revocation = (
+            request.method not in SAFE_METHODS
+            or getattr(handler, 'authenticate_from_db', False)
+        )
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        payload = validated_token.payload
+        if (
+            self.check_revocation
+            or any(claim not in payload for claim in USER_CLAIMS)
+            or payload['is_superuser']
+            or payload['role'] != UserRole.USER
+        ):
+            return super().get_user(validated_token)
+        return self.user_model(
+            id=payload[api_settings.USER_ID_CLAIM],
+            username=payload['username'],
+            role=payload['role'],
+            is_superuser=payload['is_superuser'],
+        )
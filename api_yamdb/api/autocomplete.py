@@ -0,0 +1,241 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from django.conf import settings
+from django.db import transaction
+
+from reviews.models import Category, Genre, Title
+from .cache import bump_versions, get_versions
+
+AUTOCOMPLETE_LIMIT = getattr(settings, 'AUTOCOMPLETE_LIMIT', 10)
+AUTOCOMPLETE_MAX_LIMIT = getattr(settings, 'AUTOCOMPLETE_MAX_LIMIT', 50)
+# Keys are cut to this length; matches of longer queries are checked
+# against the whole name.
+KEY_LENGTH = 40
+BLOCK_SIZE = 64
+# Separators inside packed blocks; normalized keys never contain them
+# and they are dropped from stored names.
+RECORD = '\x1e'
+FIELD = '\x1f'
+
+
+def normalize(text):
+    text = text.casefold().replace('ё', 'е')
+    return ' '.join(
+        ''.join(char if char.isalnum() else ' ' for char in text).split())
+
+
+def name_keys(name):
+    """The normalized name from every word on, so any word can be typed."""
+    words = normalize(name).split()
+    return {
+        ' '.join(words[start:])[:KEY_LENGTH] for start in range(len(words))}
+
+
+def matches(name, prefix):
+    words = normalize(name).split()
+    return any(
+        ' '.join(words[start:]).startswith(prefix)
+        for start in range(len(words))
+    )
+
+
+class PackedSortedList:
+    """Sorted strings, up to 2 * BLOCK_SIZE of them joined in one string.
+
+    A block costs one object instead of one per string, several times
+    less memory; lookups only split the blocks they read.
+    """
+
+    def __init__(self, items):
+        self.blocks = []
+        self.firsts = []
+        for start in range(0, len(items), BLOCK_SIZE):
+            chunk = items[start:start + BLOCK_SIZE]
+            self.blocks.append(RECORD.join(chunk))
+            self.firsts.append(chunk[0])
+
+    def block_of(self, item):
+        return max(bisect_right(self.firsts, item) - 1, 0)
+
+    def store(self, index, chunk):
+        if not chunk:
+            del self.blocks[index], self.firsts[index]
+        elif len(chunk) > 2 * BLOCK_SIZE:
+            half = len(chunk) // 2
+            self.blocks[index:index + 1] = [
+                RECORD.join(chunk[:half]), RECORD.join(chunk[half:])]
+            self.firsts[index:index + 1] = [chunk[0], chunk[half]]
+        else:
+            self.blocks[index] = RECORD.join(chunk)
+            self.firsts[index] = chunk[0]
+
+    def add(self, item):
+        if not self.blocks:
+            self.blocks, self.firsts = [item], [item]
+            return
+        index = self.block_of(item)
+        chunk = self.blocks[index].split(RECORD)
+        insort(chunk, item)
+        self.store(index, chunk)
+
+    def remove(self, item):
+        if not self.blocks:
+            return
+        index = self.block_of(item)
+        chunk = self.blocks[index].split(RECORD)
+        position = bisect_left(chunk, item)
+        if chunk[position:position + 1] == [item]:
+            del chunk[position]
+            self.store(index, chunk)
+
+    def starting_with(self, prefix):
+        first = index = self.block_of(prefix)
+        while index < len(self.blocks):
+            chunk = self.blocks[index].split(RECORD)
+            start = bisect_left(chunk, prefix) if index == first else 0
+            for item in chunk[start:]:
+                if not item.startswith(prefix):
+                    return
+                yield item
+            index += 1
+
+
+class PackedValues:
+    """Strings by primary key, BLOCK_SIZE neighbouring keys per string."""
+
+    def __init__(self):
+        self.blocks = {}
+
+    def get(self, pk):
+        block = self.blocks.get(pk // BLOCK_SIZE)
+        return block.split(RECORD)[pk % BLOCK_SIZE] if block else ''
+
+    def set(self, pk, value):
+        number, slot = divmod(pk, BLOCK_SIZE)
+        block = self.blocks.get(number)
+        values = block.split(RECORD) if block else [''] * BLOCK_SIZE
+        values[slot] = value
+        if any(values):
+            self.blocks[number] = RECORD.join(values)
+        else:
+            self.blocks.pop(number, None)
+
+
+class PrefixIndex:
+    """Prefix index over the names of a model.
+
+    Keys are '<normalized name suffix><FIELD><pk>' in a packed sorted
+    list, so a lookup is a bisect and a walk over the matching keys.
+    The index is built at first use. Saves and deletes in this process
+    update it in place and bump its version scope; a version this
+    process did not make means another process changed the model, and
+    the index is built again.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        # The id is the key itself, only the other fields are stored.
+        self.stored = tuple(field for field in fields if field != 'id')
+        self.name_position = self.stored.index('name')
+        self.scope = f'autocomplete:{model._meta.label_lower}'
+        self.keys = None
+        self.values = None
+        self.version = None
+        self.lock = threading.Lock()
+
+    def pack(self, values):
+        return FIELD.join(
+            str(value).replace(RECORD, ' ').replace(FIELD, ' ')
+            for value in values
+        )
+
+    def unpack(self, pk, packed):
+        values = dict(zip(self.stored, packed.split(FIELD)))
+        return {
+            field: pk if field == 'id' else values[field]
+            for field in self.fields
+        }
+
+    def keys_of(self, pk, packed):
+        name = packed.split(FIELD)[self.name_position]
+        return [f'{key}{FIELD}{pk}' for key in name_keys(name)]
+
+    def build(self, version):
+        keys = []
+        self.values = PackedValues()
+        rows = self.model.objects.order_by().values_list('pk', *self.stored)
+        for pk, *values in rows.iterator():
+            packed = self.pack(values)
+            self.values.set(pk, packed)
+            keys.extend(self.keys_of(pk, packed))
+        keys.sort()
+        self.keys = PackedSortedList(keys)
+        self.version = version
+
+    def search(self, query, limit):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        version = get_versions([self.scope])[self.scope]
+        results = []
+        seen = set()
+        with self.lock:
+            if version != self.version:
+                self.build(version)
+            for key in self.keys.starting_with(prefix[:KEY_LENGTH]):
+                pk = int(key.rpartition(FIELD)[2])
+                if pk in seen:
+                    continue
+                seen.add(pk)
+                result = self.unpack(pk, self.values.get(pk))
+                if len(prefix) <= KEY_LENGTH or matches(
+                        result['name'], prefix):
+                    results.append(result)
+                    if len(results) == limit:
+                        break
+        return results
+
+    def update(self, pk, values):
+        """Applies a committed change; values is None for a delete."""
+        with self.lock:
+            if self.keys is not None:
+                known = get_versions([self.scope])[self.scope]
+                old = self.values.get(pk)
+                if old:
+                    for key in self.keys_of(pk, old):
+                        self.keys.remove(key)
+                packed = '' if values is None else self.pack(values)
+                self.values.set(pk, packed)
+                if packed:
+                    for key in self.keys_of(pk, packed):
+                        self.keys.add(key)
+            version = bump_versions(self.scope)[self.scope]
+            if self.keys is not None:
+                # Changes made elsewhere since the last check are not in
+                # the index yet.
+                self.version = version if known == self.version else None
+
+
+INDEXES = {
+    'titles': PrefixIndex(Title, ('id', 'name')),
+    'genres': PrefixIndex(Genre, ('name', 'slug')),
+    'categories': PrefixIndex(Category, ('name', 'slug')),
+}
+MODEL_INDEXES = {index.model: index for index in INDEXES.values()}
+
+
+def item_saved(sender, instance, **kwargs):
+    index = MODEL_INDEXES.get(sender)
+    if index is not None:
+        pk = instance.pk
+        values = [getattr(instance, field) for field in index.stored]
+        transaction.on_commit(lambda: index.update(pk, values))
+
+
+def item_deleted(sender, instance, **kwargs):
+    index = MODEL_INDEXES.get(sender)
+    if index is not None:
+        pk = instance.pk
+        transaction.on_commit(lambda: index.update(pk, None))
@@ -0,0 +1,143 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .metrics import REGISTRY, RESPONSE_CACHE
+
+VERSION_KEY = 'version:{}'
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60)
+
+
+def model_scope(model):
+    return f'model:{model._meta.label_lower}'
+
+
+def get_versions(scopes):
+    """Returns the current version of every scope, creating missing ones.
+
+    Versions are millisecond timestamps, so a version lost to eviction or
+    a cache restart never comes back with a value that was used before.
+    """
+    keys = {VERSION_KEY.format(scope): scope for scope in scopes}
+    found = cache.get_many(list(keys))
+    now = int(time.time() * 1000)
+    missing = {key: now for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_versions(*scopes):
+    now = int(time.time() * 1000)
+    keys = {VERSION_KEY.format(scope): scope for scope in scopes}
+    current = cache.get_many(list(keys))
+    versions = {key: max(current.get(key, 0) + 1, now) for key in keys}
+    cache.set_many(versions, timeout=None)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+class CacheStats:
+    """Hit/miss counters of the response cache, kept in api.metrics."""
+
+    def add(self, result):
+        RESPONSE_CACHE.inc(result=result)
+
+    def snapshot(self):
+        samples = REGISTRY.local_samples()
+        return {
+            result: samples.get(RESPONSE_CACHE.key({'result': result}), 0)
+            for result in ('hit', 'miss')
+        }
+
+
+response_cache_stats = CacheStats()
+
+
+class AnonymousListCacheMixin:
+    """Serves list to anonymous users from the cache.
+
+    Views name the version scopes their data depends on in
+    get_cache_scopes(); api.signals bumps them on writes.
+    """
+    cache_timeout = RESPONSE_CACHE_TIMEOUT
+
+    def get_cache_scopes(self):
+        raise NotImplementedError
+
+    def get_scope_versions(self):
+        if not hasattr(self, '_scope_versions'):
+            self._scope_versions = get_versions(self.get_cache_scopes())
+        return self._scope_versions
+
+    def get_response_digest(self, request):
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+        )
+        versions = sorted(self.get_scope_versions().items())
+        raw = repr((request.path, params, versions))
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def get_response_cache_key(self, request):
+        return 'response:' + self.get_response_digest(request)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            response_cache_stats.add('hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response_cache_stats.add('miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class AnonymousCacheMixin(AnonymousListCacheMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin(AnonymousCacheMixin):
+    """Answers If-None-Match / If-Modified-Since from scope versions.
+
+    Versions are millisecond timestamps of the last write, so they give
+    both the ETag and Last-Modified without touching the database.
+    """
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = '"{}"'.format(self.get_response_digest(request))
+        last_modified = max(self.get_scope_versions().values()) // 1000
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
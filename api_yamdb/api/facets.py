@@ -0,0 +1,169 @@
+import operator
+import threading
+
+from django.conf import settings
+
+from reviews.models import Category, Genre, Title
+from .cache import get_versions
+
+FACET_YEAR_BUCKET = getattr(settings, 'FACET_YEAR_BUCKET', 10)
+FACETS_SCOPE = 'facets'
+# Filters the bitmaps can answer; any other one is run in SQL.
+YEAR_FILTERS = {
+    'year': operator.eq, 'year_min': operator.ge, 'year_max': operator.le}
+BITMAP_FILTERS = {'genre', 'category', *YEAR_FILTERS}
+
+try:
+    popcount = int.bit_count
+except AttributeError:
+    def popcount(bits):
+        return bin(bits).count('1')
+
+
+def bitmap(ids):
+    """An int with bit n set for every n in ids."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    data = bytearray(max(ids) // 8 + 1)
+    for pk in ids:
+        data[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(data, 'little')
+
+
+def group(pairs):
+    groups = {}
+    for key, pk in pairs:
+        if key is not None:
+            groups.setdefault(key, []).append(pk)
+    return {key: bitmap(ids) for key, ids in groups.items()}
+
+
+class FacetIndex:
+    """Title ids per genre, category and year, as int bitmaps.
+
+    A facet count is the number of bits set in the filter's bitmap and
+    the value's bitmap, so counts for every value take no queries.
+    """
+
+    def __init__(self):
+        titles = Title.objects.order_by().values_list(
+            'pk', 'category__slug', 'year')
+        rows = list(titles.iterator())
+        self.all = bitmap(pk for pk, _, _ in rows)
+        self.categories = group((slug, pk) for pk, slug, _ in rows)
+        self.years = group((year, pk) for pk, _, year in rows)
+        genres = Title.genre.through.objects.order_by().values_list(
+            'genre__slug', 'title_id')
+        self.genres = group(genres.iterator())
+        self.genre_names = dict(Genre.objects.values_list('slug', 'name'))
+        self.category_names = dict(
+            Category.objects.values_list('slug', 'name'))
+
+    def match(self, filters):
+        """Bitmap of titles passing filters, None if SQL is needed."""
+        filters = {name: value for name, value in filters.items()
+                   if name != 'ordering' and value not in (None, '', [])}
+        if not set(filters) <= BITMAP_FILTERS:
+            return None
+        bits = self.all
+        for name, values in (('genre', self.genres),
+                             ('category', self.categories)):
+            if name in filters:
+                bits &= self.union(values, filters[name])
+        years = {name: value for name, value in filters.items()
+                 if name in YEAR_FILTERS}
+        if years:
+            bits &= self.union(self.years, [
+                year for year in self.years
+                if all(YEAR_FILTERS[name](year, value)
+                       for name, value in years.items())
+            ])
+        return bits
+
+    def union(self, bitmaps, keys):
+        bits = 0
+        for key in keys:
+            bits |= bitmaps.get(key, 0)
+        return bits
+
+    def named_counts(self, bits, bitmaps, names):
+        counts = [
+            {'slug': slug, 'name': names.get(slug, slug),
+             'count': popcount(bits & values)}
+            for slug, values in bitmaps.items()
+        ]
+        return sorted(
+            (count for count in counts if count['count']),
+            key=lambda count: (-count['count'], count['name']))
+
+    def year_counts(self, bits):
+        buckets = {}
+        for year, values in self.years.items():
+            start = year - year % FACET_YEAR_BUCKET
+            buckets[start] = buckets.get(start, 0) + popcount(bits & values)
+        return [
+            {'from': start, 'to': start + FACET_YEAR_BUCKET - 1,
+             'count': count}
+            for start, count in sorted(buckets.items()) if count
+        ]
+
+    def counts(self, bits):
+        return {
+            'genre': self.named_counts(
+                bits, self.genres, self.genre_names),
+            'category': self.named_counts(
+                bits, self.categories, self.category_names),
+            'year': self.year_counts(bits),
+        }
+
+
+class FacetCache:
+    """The process's FacetIndex, built again when the facets scope moves.
+
+    api.signals bumps the scope on changes to titles, genres and
+    categories, and bulk loads clear the cache the versions live in.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.version = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        version = get_versions([FACETS_SCOPE])[FACETS_SCOPE]
+        with self.lock:
+            if version != self.version:
+                self.index = FacetIndex()
+                self.version = version
+            return self.index
+
+
+facet_cache = FacetCache()
+
+
+def title_facets(filters, queryset):
+    """Facet counts of the titles in queryset, filtered by filters."""
+    index = facet_cache.get()
+    bits = index.match(filters)
+    if bits is None:
+        bits = bitmap(queryset.order_by().values_list('pk', flat=True))
+    return index.counts(bits)
+
+
+class FacetsMixin:
+    """Adds facet counts to list responses on ``?facets=true``."""
+    facets_query_param = 'facets'
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        wanted = request.query_params.get(self.facets_query_param)
+        if response.status_code == 200 and wanted in ('1', 'true'):
+            filterset = self.filterset_class(
+                request.query_params, queryset=self.get_queryset(),
+                request=request)
+            # The list above has already rejected invalid filters.
+            filterset.is_valid()
+            response.data['facets'] = title_facets(
+                filterset.form.cleaned_data, filterset.qs)
+        return response
@@ -1,14 +1,41 @@
 import django_filters as filters
 
-from reviews.models import Title
+from reviews.models import Category, Title
+from reviews.search import search_titles
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Comma separated values: ``?genre=drama,comedy``."""
 
 
 class TitleFilter(filters.FilterSet):
-    genre = filters.CharFilter(field_name='genre__slug')
-    category = filters.CharFilter(field_name='category__slug')
+    genre = CharInFilter(method='filter_genre')
+    category = CharInFilter(method='filter_category')
     year = filters.NumberFilter(field_name='year')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
+    search = filters.CharFilter(method='filter_search')
+    ordering = filters.OrderingFilter(fields=('name', 'year', 'rating', 'id'))
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    # Both slug filters are id subqueries, so the (category_id, year)
+    # and (genre_id, title_id) indexes can drive them. The genre one
+    # also returns titles with several of the genres once, without
+    # DISTINCT.
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category__in=Category.objects.filter(slug__in=value))
+
+    def filter_genre(self, queryset, name, value):
+        titles = Title.genre.through.objects.filter(
+            genre__slug__in=value).values('title_id')
+        return queryset.filter(pk__in=titles)
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,391 @@
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+METRICS_MULTIPROCESS_DIR = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+METRICS_FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1)
+METRICS_ALLOWED_IPS = getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1',))
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Registry:
+    """Lock-light metric storage.
+
+    Every thread writes to its own shard, a plain dict, so recording a
+    value takes no lock; the lock is only taken when a thread records
+    its first value. Collection copies each shard and adds them up.
+    Shards of threads that have ended are added into ``base`` and
+    dropped, so a server starting a thread per request keeps one shard
+    per live thread.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.gauges = {}
+        self.base = {}
+        self.shards = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.fold_dead_shards()
+                self.shards[threading.current_thread()] = shard
+        return shard
+
+    def fold_dead_shards(self):
+        # Called with the lock held. A thread that has ended writes no
+        # more, so its shard can be read without a copy.
+        for thread, shard in list(self.shards.items()):
+            if not thread.is_alive():
+                for key, value in shard.items():
+                    merge(self.base, key, value)
+                del self.shards[thread]
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name, help_text):
+        """Registers a gauge computed when metrics are collected.
+
+        The decorated function gets the collected samples and returns a
+        number or None to leave the gauge out.
+        """
+        def decorator(callback):
+            self.gauges[name] = (help_text, callback)
+            return callback
+        return decorator
+
+    def local_samples(self):
+        samples = {}
+        with self.lock:
+            self.fold_dead_shards()
+            for key, value in self.base.items():
+                merge(samples, key, value)
+            shards = list(self.shards.values())
+        for shard in shards:
+            for key, value in shard.copy().items():
+                merge(samples, key, value)
+        return samples
+
+    def collect(self):
+        if METRICS_MULTIPROCESS_DIR:
+            flush(force=True)
+            return read_directory(METRICS_MULTIPROCESS_DIR)
+        return self.local_samples()
+
+    def render(self, samples):
+        lines = []
+        by_name = {}
+        for (name, labels), value in samples.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(by_name.get(name, [])):
+                lines.extend(metric.lines(dict(labels), value))
+        for name, (help_text, callback) in self.gauges.items():
+            value = callback(samples)
+            if value is None:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def merge(samples, key, value):
+    if isinstance(value, list):
+        current = samples.get(key)
+        if current is None:
+            samples[key] = list(value)
+        else:
+            for index, part in enumerate(value):
+                current[index] += part
+    else:
+        samples[key] = samples.get(key, 0) + value
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        REGISTRY.register(self)
+
+    def key(self, labels):
+        return self.name, tuple(
+            (label, str(labels[label])) for label in self.labels)
+
+    def inc(self, amount=1, **labels):
+        shard = REGISTRY.shard()
+        key = self.key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def lines(self, labels, value):
+        return [f'{self.name}{format_labels(labels)} {format_value(value)}']
+
+
+class Histogram(Counter):
+    """Stores per-bucket counts followed by the sum of observations."""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        shard = REGISTRY.shard()
+        key = self.key(labels)
+        values = shard.get(key)
+        if values is None:
+            values = shard[key] = [0] * (len(self.buckets) + 2)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def lines(self, labels, value):
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), value):
+            total += count
+            bucket = dict(labels, le=format_value(bound))
+            lines.append(
+                f'{self.name}_bucket{format_labels(bucket)} {total}')
+        lines.append(
+            f'{self.name}_sum{format_labels(labels)} '
+            f'{format_value(value[-1])}')
+        lines.append(f'{self.name}_count{format_labels(labels)} {total}')
+        return lines
+
+
+REGISTRY = Registry()
+
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by view, method and status.',
+    ('view', 'method', 'status'))
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time to build the response.',
+    ('view',))
+REQUEST_QUERIES = Histogram(
+    'db_queries_per_request', 'SQL statements run per request.',
+    ('view',), QUERY_COUNT_BUCKETS)
+QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Time of single SQL statements.',
+    ('view',))
+RESPONSE_CACHE = Counter(
+    'response_cache_requests_total',
+    'Anonymous GET requests answered from the cache or not.', ('result',))
+
+
+@REGISTRY.gauge(
+    'response_cache_hit_ratio', 'Share of cacheable requests that hit.')
+def response_cache_hit_ratio(samples):
+    hits = samples.get(RESPONSE_CACHE.key({'result': 'hit'}), 0)
+    misses = samples.get(RESPONSE_CACHE.key({'result': 'miss'}), 0)
+    if not hits + misses:
+        return None
+    return hits / (hits + misses)
+
+
+@REGISTRY.gauge('email_queue_depth', 'Emails waiting to be sent.')
+def email_queue_depth(samples):
+    from reviews.outbox import pending
+
+    return pending().count()
+
+
+# Multiprocess mode: every process keeps its own registry and writes it
+# to a file of its own, the process serving /metrics adds them all up.
+# The directory is cleared when the server starts (clear_directory), and
+# the files of workers that exit are added into ARCHIVE_FILE
+# (mark_process_dead), so counters neither drop nor pile up in files.
+# gunicorn.conf.py calls both from the master's hooks.
+ARCHIVE_FILE = 'archive.json'
+process_file = None
+last_flush = 0
+flush_lock = threading.Lock()
+
+
+def write_json(path, data):
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as output:
+        json.dump(data, output)
+    os.replace(temporary, path)
+
+
+def read_json(path, default):
+    try:
+        with open(path) as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return default
+
+
+def dump_samples(samples):
+    return [[name, labels, value] for (name, labels), value in samples.items()]
+
+
+def load_samples(samples, stored):
+    for name, labels, value in stored:
+        merge(samples, (name, tuple(map(tuple, labels))), value)
+    return samples
+
+
+def flush(force=False):
+    global process_file, last_flush
+    now = time.monotonic()
+    if not force and now - last_flush < METRICS_FLUSH_INTERVAL:
+        return
+    with flush_lock:
+        last_flush = now
+        if process_file is None:
+            os.makedirs(METRICS_MULTIPROCESS_DIR, exist_ok=True)
+            # The start time keeps a reused pid from taking over the
+            # file of a process that is gone.
+            process_file = os.path.join(
+                METRICS_MULTIPROCESS_DIR,
+                f'metrics-{os.getpid()}-{time.time_ns()}.json')
+        write_json(process_file, dump_samples(REGISTRY.local_samples()))
+
+
+def read_directory(directory):
+    files = {}
+    for filename in os.listdir(directory):
+        if filename.startswith('metrics-') and filename.endswith('.json'):
+            stored = read_json(os.path.join(directory, filename), None)
+            if stored is not None:
+                files[filename] = stored
+    # Read last: a worker file read above and added into the archive
+    # since is in its list and is counted once, from the archive.
+    archive = read_json(os.path.join(directory, ARCHIVE_FILE), {})
+    samples = load_samples({}, archive.get('samples', []))
+    archived = set(archive.get('files', []))
+    for filename, stored in files.items():
+        if filename not in archived:
+            load_samples(samples, stored)
+    return samples
+
+
+def clear_directory(directory=None):
+    """Removes the files of earlier runs; call before workers start."""
+    directory = directory or METRICS_MULTIPROCESS_DIR
+    if not directory or not os.path.isdir(directory):
+        return
+    for filename in os.listdir(directory):
+        if filename.startswith(('metrics-', 'archive.')):
+            os.remove(os.path.join(directory, filename))
+
+
+def mark_process_dead(pid, directory=None):
+    """Adds the files of an exited worker into the archive."""
+    directory = directory or METRICS_MULTIPROCESS_DIR
+    if not directory or not os.path.isdir(directory):
+        return
+    prefix = f'metrics-{pid}-'
+    dead = [filename for filename in os.listdir(directory)
+            if filename.startswith(prefix)]
+    if not dead:
+        return
+    path = os.path.join(directory, ARCHIVE_FILE)
+    archive = read_json(path, {})
+    samples = load_samples({}, archive.get('samples', []))
+    for filename in dead:
+        if filename.endswith('.json'):
+            load_samples(
+                samples, read_json(os.path.join(directory, filename), []))
+    # Keep the names of files still on disk: readers skip them.
+    files = [filename for filename in archive.get('files', [])
+             if os.path.exists(os.path.join(directory, filename))]
+    write_json(path, {
+        'samples': dump_samples(samples),
+        'files': files + [filename for filename in dead
+                          if filename.endswith('.json')],
+    })
+    for filename in dead:
+        os.remove(os.path.join(directory, filename))
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    view = getattr(match.func, 'cls', match.func)
+    return view.__name__
+
+
+class MetricsMiddleware:
+    """Counts requests and SQL statements per view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        durations = []
+
+        def timed(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                durations.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timed))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        view = view_name(request)
+        REQUESTS.inc(view=view, method=request.method,
+                     status=response.status_code)
+        REQUEST_DURATION.observe(elapsed, view=view)
+        REQUEST_QUERIES.observe(len(durations), view=view)
+        for duration in durations:
+            QUERY_DURATION.observe(duration, view=view)
+        if METRICS_MULTIPROCESS_DIR:
+            flush()
+        return response
+
+
+def metrics(request):
+    if request.META.get('REMOTE_ADDR') not in METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        REGISTRY.render(REGISTRY.collect()), content_type=CONTENT_TYPE)
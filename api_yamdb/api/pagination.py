@@ -0,0 +1,124 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from rest_framework.pagination import (
+    CursorPagination, LimitOffsetPagination, PageNumberPagination)
+
+from .cache import get_versions, model_scope
+
+COUNT_CACHE_TIMEOUT = getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 30)
+COUNT_ESTIMATE_THRESHOLD = getattr(
+    settings, 'PAGINATION_COUNT_ESTIMATE_THRESHOLD', 100000)
+PAGINATION_PARAMS = {'page', 'page_size', 'limit', 'offset', 'cursor',
+                     'pagination'}
+
+
+def related_models(model):
+    models = {model}
+    for field in model._meta.get_fields():
+        if field.concrete and field.is_relation and field.related_model:
+            models.add(field.related_model)
+    return models
+
+
+def estimate_count(queryset):
+    """Planner's row count for an unfiltered table, or None if unavailable.
+
+    Only PostgreSQL keeps one (pg_class.reltuples); other databases
+    count exactly.
+    """
+    query = queryset.query
+    if query.where or query.distinct or query.low_mark or query.high_mark:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] > 0 else None
+
+
+class CachedCountMixin:
+    """Caches COUNT(*) per endpoint and filter set until the model changes."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_cache_key(self, queryset):
+        params = sorted(
+            (key, sorted(values))
+            for key, values in self.request.query_params.lists()
+            if key not in PAGINATION_PARAMS
+        )
+        versions = get_versions(
+            model_scope(model) for model in related_models(queryset.model))
+        raw = repr((self.request.path, params, sorted(versions.items())))
+        return 'count:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def get_count(self, queryset):
+        key = self.get_count_cache_key(queryset)
+        count = cache.get(key)
+        if count is None:
+            count = estimate_count(queryset)
+            if count is None or count < COUNT_ESTIMATE_THRESHOLD:
+                count = queryset.count()
+            cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class CachedCountPagination(CachedCountMixin, PageNumberPagination):
+
+    # Called by PageNumberPagination in place of a Paginator class.
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        paginator.count = self.get_count(object_list)
+        return paginator
+
+
+class CachedCountLimitOffsetPagination(CachedCountMixin,
+                                       LimitOffsetPagination):
+    pass
+
+
+class OptionalCursorPagination(CachedCountPagination):
+    """Page numbers by default, keyset pages on ``?pagination=cursor``.
+
+    The keyset ordering is taken from the view's ``cursor_ordering``.
+    """
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def get_cursor_paginator(self, view):
+        paginator = CursorPagination()
+        paginator.page_size = self.page_size
+        paginator.cursor_query_param = self.cursor_query_param
+        paginator.ordering = getattr(view, 'cursor_ordering', '-id')
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.get_cursor_paginator(view)
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,7 +1,9 @@
 from rest_framework.permissions import (
     BasePermission, SAFE_METHODS)
 
-from reviews.models import UserRole
+
+def is_author(request, obj):
+    return obj.author_id == request.user.id
 
 
 class AdminAuthorOrReadOnly(BasePermission):
@@ -14,16 +16,15 @@ class AdminAuthorOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in SAFE_METHODS
-            or obj.author == request.user
-            or request.user.role == UserRole.ADMIN
+            or is_author(request, obj)
+            or request.user.is_admin
         )
 
 
 class AdminPermission(BasePermission):
 
     def has_permission(self, request, view):
-        if request.user.is_superuser:
-            return True
+        return bool(request.user.is_superuser)
 
 
 class MeUserPermission(BasePermission):
@@ -37,7 +38,7 @@ class MeUserPermission(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in SAFE_METHODS
-            or obj.author == request.user or request.user.is_authenticated
+            or is_author(request, obj) or request.user.is_authenticated
         )
 
 
@@ -60,7 +61,7 @@ class AdminModeratorAuthorPermission(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in SAFE_METHODS
-            or obj.author == request.user
-            or request.user.role == UserRole.MODERATOR
-            or request.user.role == UserRole.ADMIN
+            or is_author(request, obj)
+            or request.user.is_moderator
+            or request.user.is_admin
         )
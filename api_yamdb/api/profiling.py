@@ -0,0 +1,183 @@
+import cProfile
+import os
+import random
+import re
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from .authentication import StatelessJWTAuthentication
+
+PROFILING_ENABLED = getattr(settings, 'PROFILING_ENABLED', False)
+PROFILING_TOP_QUERIES = getattr(settings, 'PROFILING_TOP_QUERIES', 5)
+PROFILING_SAMPLE_RATE = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+PROFILING_DIR = getattr(settings, 'PROFILING_DIR', 'profiles')
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+current_profile = ContextVar('current_profile', default=None)
+
+
+class RequestProfile:
+    """Timings of one request, in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0
+        self.queries = []
+        self.serializer = 0
+        self.serializer_depth = 0
+        self.render_started = None
+        self.render = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - started, sql))
+
+    @property
+    def db(self):
+        return sum(duration for duration, _ in self.queries)
+
+    def slowest(self, count):
+        return sorted(self.queries, key=lambda query: -query[0])[:count]
+
+    def server_timing(self, top_queries=0):
+        metrics = [
+            ('db', self.db, f'{len(self.queries)} queries'),
+            ('serializer', self.serializer, None),
+            ('render', self.render, None),
+            ('total', self.total, None),
+        ]
+        metrics += [
+            (f'sql-{number}', duration, sql)
+            for number, (duration, sql) in enumerate(
+                self.slowest(top_queries), 1)
+        ]
+        return ', '.join(
+            f'{name};dur={duration * 1000:.2f}'
+            + (f';desc="{header_text(desc)}"' if desc else '')
+            for name, duration, desc in metrics
+        )
+
+
+def header_text(text, limit=200):
+    """Shortened text as the body of a quoted-string header value."""
+    text = re.sub(r'\s+', ' ', text).encode('ascii', 'replace').decode()
+    if len(text) > limit:
+        text = text[:limit - 3] + '...'
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+@contextmanager
+def serializer_timer():
+    """Adds the time spent inside to the current profile, once per nest."""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    profile.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_depth -= 1
+        if not profile.serializer_depth:
+            profile.serializer += time.perf_counter() - started
+
+
+class ProfiledSerializerMixin:
+    """Reports time spent in validation and representation."""
+
+    def run_validation(self, *args, **kwargs):
+        with serializer_timer():
+            return super().run_validation(*args, **kwargs)
+
+    def to_representation(self, *args, **kwargs):
+        with serializer_timer():
+            return super().to_representation(*args, **kwargs)
+
+
+def is_admin_request(request):
+    authentication = StatelessJWTAuthentication()
+    try:
+        result = authentication.authenticate(Request(request))
+    except exceptions.APIException:
+        return False
+    if result is None:
+        return False
+    user = result[0]
+    return user.is_admin or user.is_superuser
+
+
+def profile_path(request):
+    name = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-')
+    return os.path.join(PROFILING_DIR, '{}-{}-{}.prof'.format(
+        time.strftime('%Y%m%d-%H%M%S'), request.method, name or 'root'))
+
+
+class ProfilingMiddleware:
+    """Times SQL, serializers, rendering and the whole request.
+
+    Profiling runs for every request with PROFILING_ENABLED and for
+    admin requests with an X-Profile header. The summary goes to the
+    Server-Timing header, plus the slowest statements as sql-N entries
+    for X-Profile requests. A share of profiled requests
+    (PROFILING_SAMPLE_RATE), or ones sent with "X-Profile: cprofile",
+    also run under cProfile and are dumped to PROFILING_DIR.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = request.META.get(PROFILE_HEADER)
+        if requested and not is_admin_request(request):
+            requested = None
+        if not PROFILING_ENABLED and not requested:
+            return self.get_response(request)
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        sampled = (requested == 'cprofile'
+                   or random.random() < PROFILING_SAMPLE_RATE)
+        profiler = cProfile.Profile() if sampled else None
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                if profiler:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler:
+                        profiler.disable()
+        finally:
+            current_profile.reset(token)
+        profile.total = time.perf_counter() - profile.started
+        response['Server-Timing'] = profile.server_timing(
+            PROFILING_TOP_QUERIES if requested else 0)
+        if profiler:
+            os.makedirs(PROFILING_DIR, exist_ok=True)
+            path = profile_path(request)
+            profiler.dump_stats(path)
+            response['X-Profile-File'] = os.path.basename(path)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        profile = current_profile.get()
+        if profile is not None:
+            profile.render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: self.rendered(profile))
+        return response
+
+    def rendered(self, profile):
+        profile.render = time.perf_counter() - profile.render_started
@@ -1,32 +1,29 @@
 import re
 import datetime as dt
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 
 from reviews.models import Comment, Review, User, Genre, Category, Title
+from .profiling import ProfiledSerializerMixin
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class ReviewsSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
     title = serializers.SlugRelatedField(
         slug_field='name',
         read_only=True
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        if (
-            request.method == 'POST'
-            and Review.objects.filter(title=title, author=author).exists()
-        ):
+    def create(self, validated_data):
+        validated_data.setdefault('title', self.context['title'])
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
                 'Может существовать только один отзыв!'
             )
-        return data
 
     def validate_score(self, value):
         if not 1 <= value <= 10:
@@ -38,21 +35,29 @@ class ReviewsSerializer(serializers.ModelSerializer):
         model = Review
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    review = serializers.SlugRelatedField(
-        slug_field='text',
-        read_only=True
-    )
+class CommentSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
 
     class Meta:
         fields = '__all__'
+        read_only_fields = ('review',)
         model = Comment
 
 
-class RegistrationSerializer(serializers.Serializer):
+class ReviewShortSerializer(ProfiledSerializerMixin,
+                            serializers.ModelSerializer):
+    class Meta:
+        fields = ('id', 'text', 'score', 'pub_date')
+        model = Review
+
+
+class CommentExpandedSerializer(CommentSerializer):
+    review = ReviewShortSerializer(read_only=True)
+
+
+class RegistrationSerializer(ProfiledSerializerMixin, serializers.Serializer):
     username = serializers.CharField(required=True)
     email = serializers.EmailField(required=True)
 
@@ -75,7 +80,7 @@ class RegistrationSerializer(serializers.Serializer):
         return value
 
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(ProfiledSerializerMixin, serializers.Serializer):
     username = serializers.CharField(required=True)
     confirmation_code = serializers.CharField(required=True)
 
@@ -84,7 +89,8 @@ class LoginSerializer(serializers.Serializer):
         fields = ['username', 'confirmation_code']
 
 
-class ValidateSlugNameSerializer(serializers.ModelSerializer):
+class ValidateSlugNameSerializer(ProfiledSerializerMixin,
+                                 serializers.ModelSerializer):
     def validate_slug(self, value):
         if (
             re.match('^[-a-zA-Z0-9_]+$', value) is not None and len(value) < 51
@@ -114,7 +120,8 @@ class CategorySerializer(ValidateSlugNameSerializer):
         fields = ('name', 'slug')
 
 
-class TitlesPostSerializer(serializers.ModelSerializer):
+class TitlesPostSerializer(ProfiledSerializerMixin,
+                           serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
@@ -124,7 +131,8 @@ class TitlesPostSerializer(serializers.ModelSerializer):
         slug_field='slug')
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
+        read_only_fields = ('rating',)
         model = Title
 
     def validate_year(self, value):
@@ -135,18 +143,19 @@ class TitlesPostSerializer(serializers.ModelSerializer):
         return value
 
 
-class TitlesGetSerializer(serializers.ModelSerializer):
+class TitlesGetSerializer(ProfiledSerializerMixin,
+                          serializers.ModelSerializer):
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta():
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
         read_only_fields = ('id',)
         model = Title
 
 
-class UsersSerializer(serializers.ModelSerializer):
+class UsersSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -155,7 +164,7 @@ class UsersSerializer(serializers.ModelSerializer):
         )
 
 
-class UsersMeSerializer(serializers.ModelSerializer):
+class UsersMeSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(required=True)
     email = serializers.CharField(required=True)
     role = serializers.StringRelatedField(read_only=True)
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from .autocomplete import item_deleted, item_saved
+from .cache import bump_versions, model_scope
+from .facets import FACETS_SCOPE
+
+SQLITE_PRAGMAS = getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def bump_on_commit(*scopes):
+    # Bumping before commit would let a concurrent read cache old data
+    # under the new version.
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+def title_scopes(title_id):
+    return ['titles', f'title:{title_id}', f'reviews:{title_id}']
+
+
+def author_scopes(user):
+    """Scopes of the reviews and comments showing a renamed user's name."""
+    if user.loaded_username in (None, user.username):
+        return []
+    user.loaded_username = user.username
+    title_ids = Review.objects.filter(author=user).values_list(
+        'title_id', flat=True)
+    review_ids = Comment.objects.filter(author=user).values_list(
+        'review_id', flat=True).distinct()
+    return [f'reviews:{title_id}' for title_id in title_ids] + [
+        f'comments:{review_id}' for review_id in review_ids]
+
+
+def response_scopes(instance):
+    """Cache scopes (see views' get_cache_scopes) a change to instance hits."""
+    if isinstance(instance, Genre):
+        return ['genres', 'titles', 'catalog', FACETS_SCOPE]
+    if isinstance(instance, Category):
+        return ['categories', 'titles', 'catalog', FACETS_SCOPE]
+    if isinstance(instance, Title):
+        return title_scopes(instance.pk) + [FACETS_SCOPE]
+    if isinstance(instance, Review):
+        # The title's rating moves with its reviews, written by
+        # QuerySet.update() that sends no signal for the title itself.
+        return title_scopes(instance.title_id) + [
+            f'comments:{instance.pk}', model_scope(Title)]
+    if isinstance(instance, Comment):
+        return [f'comments:{instance.review_id}']
+    if isinstance(instance, User):
+        return author_scopes(instance)
+    return []
+
+
+def model_changed(sender, instance, **kwargs):
+    if sender._meta.app_label == 'reviews':
+        bump_on_commit(model_scope(sender), *response_scopes(instance))
+
+
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    scopes = [model_scope(Title), 'titles', FACETS_SCOPE]
+    if not reverse:
+        scopes += title_scopes(instance.pk)
+    else:
+        # Genre side: title ids are in pk_set, except for clear().
+        scopes.append('catalog')
+        for title_id in pk_set or ():
+            scopes += title_scopes(title_id)
+    bump_on_commit(*scopes)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    # The raw connection keeps these out of the per-request query log.
+    if connection.vendor == 'sqlite':
+        for name, value in SQLITE_PRAGMAS.items():
+            connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def connect():
+    connection_created.connect(
+        configure_sqlite, dispatch_uid='api_configure_sqlite')
+    post_save.connect(model_changed, dispatch_uid='api_model_saved')
+    post_delete.connect(model_changed, dispatch_uid='api_model_deleted')
+    post_save.connect(item_saved, dispatch_uid='api_autocomplete_saved')
+    post_delete.connect(item_deleted, dispatch_uid='api_autocomplete_deleted')
+    m2m_changed.connect(
+        title_genres_changed, sender=Title.genre.through,
+        dispatch_uid='api_title_genres_changed'
+    )
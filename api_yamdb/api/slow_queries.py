@@ -0,0 +1,148 @@
+import atexit
+import logging
+import queue
+import textwrap
+import threading
+import time
+from contextlib import ExitStack
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import view_name
+
+SLOW_QUERY_THRESHOLD_MS = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100)
+SLOW_QUERY_LOG_FILE = getattr(settings, 'SLOW_QUERY_LOG_FILE', None)
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH')
+
+logger = logging.getLogger(__name__)
+logger.propagate = False
+log_queue = queue.Queue()
+listener = None
+listener_lock = threading.Lock()
+
+
+def sqlite_plan(rows):
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return '\n'.join(lines)
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else (
+        'EXPLAIN ')
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    if connection.vendor == 'sqlite':
+        return sqlite_plan(rows)
+    return '\n'.join(' '.join(map(str, row)) for row in rows)
+
+
+class ExplainFilter(logging.Filter):
+    """Adds the query plan; runs in the listener thread, off the request."""
+
+    def filter(self, record):
+        record.plan = ''
+        sql = getattr(record, 'sql', '')
+        if sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            try:
+                record.plan = explain(record.alias, sql, record.params)
+            except Exception as error:
+                record.plan = f'EXPLAIN failed: {error}'
+        return True
+
+
+class SlowQueryFormatter(logging.Formatter):
+
+    def format(self, record):
+        lines = [
+            super().format(record),
+            f'  request: {record.method} {record.path}',
+            f'  sql: {record.sql}',
+            f'  params: {record.params!r}',
+        ]
+        if record.plan:
+            lines.append('  plan:')
+            lines.append(textwrap.indent(record.plan, '    '))
+        return '\n'.join(lines)
+
+
+def start_listener():
+    global listener
+    with listener_lock:
+        if listener is not None:
+            return
+        if SLOW_QUERY_LOG_FILE:
+            handler = logging.FileHandler(
+                SLOW_QUERY_LOG_FILE, encoding='utf-8', delay=True)
+        else:
+            handler = logging.StreamHandler()
+        handler.addFilter(ExplainFilter())
+        handler.setFormatter(SlowQueryFormatter(
+            '%(asctime)s slow query %(duration).1f ms in %(view)s'))
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        if not logger.handlers:
+            logger.addHandler(QueueHandler(log_queue))
+            logger.setLevel(logging.WARNING)
+
+
+def stop_listener():
+    """Writes out everything queued so far and stops the thread."""
+    global listener
+    with listener_lock:
+        if listener is None:
+            return
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        listener = None
+
+
+atexit.register(stop_listener)
+
+
+class SlowQueryMiddleware:
+    """Logs statements slower than SLOW_QUERY_THRESHOLD_MS.
+
+    The request thread only puts a record on a queue; the listener
+    thread runs EXPLAIN on its own connection and writes the log.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if SLOW_QUERY_THRESHOLD_MS is not None:
+            start_listener()
+
+    def __call__(self, request):
+        if SLOW_QUERY_THRESHOLD_MS is None:
+            return self.get_response(request)
+
+        def timed(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = (time.perf_counter() - started) * 1000
+                if duration >= SLOW_QUERY_THRESHOLD_MS and not many:
+                    logger.warning('slow query', extra={
+                        'duration': duration,
+                        'view': view_name(request),
+                        'method': request.method,
+                        'path': unquote(request.get_full_path()),
+                        'sql': sql,
+                        'params': tuple(params or ()),
+                        'alias': context['connection'].alias,
+                    })
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timed))
+            return self.get_response(request)
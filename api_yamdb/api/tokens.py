@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_CLAIMS = ('username', 'role', 'is_superuser')
+CONFIRMATION_CODE_TIMEOUT = getattr(
+    settings, 'CONFIRMATION_CODE_TIMEOUT', 24 * 60 * 60)
+
+
+class RoleRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+def confirmation_signature(user_id, timestamp):
+    return salted_hmac(
+        'api.tokens.confirmation_code', f'{user_id}:{timestamp}'
+    ).hexdigest()[:20]
+
+
+def make_confirmation_code(user_id, timestamp=None):
+    """Signs the user id and issue time, nothing has to be stored."""
+    if timestamp is None:
+        timestamp = int(time.time())
+    return (f'{int_to_base36(timestamp)}-'
+            f'{confirmation_signature(user_id, timestamp)}')
+
+
+def check_confirmation_code(user_id, code):
+    timestamp, _, signature = code.partition('-')
+    try:
+        timestamp = base36_to_int(timestamp)
+    except ValueError:
+        return False
+    if not 0 <= time.time() - timestamp <= CONFIRMATION_CODE_TIMEOUT:
+        return False
+    return constant_time_compare(
+        signature, confirmation_signature(user_id, timestamp))
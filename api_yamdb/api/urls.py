@@ -2,8 +2,8 @@ from rest_framework.routers import SimpleRouter
 from django.urls import include, path
 
 from .views import (
-    ReviewsViewSet, CommentsViewSet, signup,
-    token, UsersViewSet, CategoryViewSet, GenreViewSet, TitleViewSet
+    ReviewsViewSet, CommentsViewSet, signup, token, export, autocomplete,
+    UsersViewSet, CategoryViewSet, GenreViewSet, TitleViewSet
 )
 
 
@@ -30,4 +30,6 @@ urlpatterns = [
     path('v1/', include(v1_router.urls)),
     path('v1/auth/signup/', signup, name='signup'),
     path('v1/auth/token/', token, name='token'),
+    path('v1/export/<str:table>/', export, name='export'),
+    path('v1/autocomplete/', autocomplete, name='autocomplete'),
 ]
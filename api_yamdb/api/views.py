@@ -2,20 +2,22 @@ from rest_framework import viewsets, mixins, filters
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.views.decorators.http import require_GET
 from rest_framework import filters
-from rest_framework.pagination import LimitOffsetPagination
 from django_filters.rest_framework import DjangoFilterBackend
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from rest_framework.decorators import action
 from rest_framework.decorators import api_view, permission_classes
 
+from reviews.exporter import (
+    CONTENT_TYPES, FORMATS, TABLE_NAMES, export_filename, export_table)
 from reviews.models import Review, Title, User, Genre, Category
+from reviews.outbox import enqueue
 from api.serializers import (
     CommentSerializer,
+    CommentExpandedSerializer,
     ReviewsSerializer,
     RegistrationSerializer,
     UsersSerializer,
@@ -32,42 +34,91 @@ from api.permissions import (
     AdminOrReadOnly,
     AdminModeratorAuthorPermission,
 )
+from .authentication import authenticate_from_db
+from .autocomplete import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT, INDEXES
+from .cache import AnonymousListCacheMixin, ConditionalGetMixin
+from .facets import FacetsMixin
 from .filters import TitleFilter
+from .pagination import (
+    CachedCountLimitOffsetPagination, OptionalCursorPagination)
+from .tokens import (
+    USER_CLAIMS, RoleRefreshToken, check_confirmation_code,
+    make_confirmation_code)
 
+EXPORT_CHUNK_SIZE = 2000
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+
+class ReviewsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ReviewsSerializer
     permission_classes = [
         AdminModeratorAuthorPermission
     ]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = 'id'
 
     def get_title(self):
-        title = get_object_or_404(Title, id=self.kwargs.get("title_id"))
-        return title
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get("title_id"))
+        return self._title
 
     def get_queryset(self):
         title = self.get_title()
-        queryset = title.reviews.order_by('id')
+        queryset = title.reviews.select_related('author').order_by('id')
         return queryset
 
+    def get_cache_scopes(self):
+        return [f'reviews:{self.kwargs.get("title_id")}']
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'POST':
+            context['title'] = self.get_title()
+        return context
+
+    # The title's rating moves in reviews.ratings signal handlers, in the
+    # same transaction as the review.
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [
         AdminModeratorAuthorPermission
     ]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = '-pub_date'
 
     def get_review(self):
-        review = get_object_or_404(Review, id=self.kwargs.get("review_id"))
-        return review
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id")
+            )
+        return self._review
 
     def get_queryset(self):
         review = self.get_review()
-        return review.comments.all()
+        return review.comments.select_related('author')
+
+    def get_cache_scopes(self):
+        return [f'comments:{self.kwargs.get("review_id")}']
+
+    def get_serializer_class(self):
+        if self.request.query_params.get('expand') == 'review':
+            return CommentExpandedSerializer
+        return CommentSerializer
 
     def perform_create(self, serializer):
         review = self.get_review()
@@ -75,11 +126,11 @@ class CommentsViewSet(viewsets.ModelViewSet):
 
 
 def send_code(user):
-    send_mail(
+    enqueue(
         user.username,
-        user.confirmation_code,
+        make_confirmation_code(user.pk),
         'from@yamdb.ru',
-        [user.email],
+        user.email,
     )
 
 
@@ -90,13 +141,15 @@ class UsersViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend, filters.SearchFilter, )
     search_fields = ('username', )
     lookup_field = 'username'
-    pagination_class = LimitOffsetPagination
+    pagination_class = CachedCountLimitOffsetPagination
 
+    # The token's claims may be out of date: the username can change
+    # and the account can be deleted.
     @action(detail=False, methods=['GET', 'PATCH'], url_path='me',
             permission_classes=(AdminAuthorOrReadOnly,))
+    @authenticate_from_db
     def me(self, request):
-        serializer = UsersMeSerializer(request.user)
-        userself = User.objects.get(username=self.request.user)
+        userself = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(userself)
             return Response(serializer.data)
@@ -117,11 +170,18 @@ def signup(request):
     username = serializer.validated_data['username']
     email = serializer.validated_data['email']
     try:
-        user, _ = User.objects.get_or_create(username=username, email=email)
-    except Exception:
-        return Response(serializer.data, status=status.HTTP_400_BAD_REQUEST)
-    user.confirmation_code = default_token_generator.make_token(user)
-    send_code(user)
+        with transaction.atomic():
+            user = User.objects.create(username=username, email=email)
+            send_code(user)
+    except IntegrityError:
+        # Signing up again sends a new code, a taken username or email
+        # is an error.
+        user = User.objects.only('pk', 'username', 'email').filter(
+            username=username, email=email).first()
+        if user is None:
+            return Response(
+                serializer.data, status=status.HTTP_400_BAD_REQUEST)
+        send_code(user)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -132,14 +192,15 @@ def token(request):
     serializer = serializer_class(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data['username']
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User.objects.only('pk', *USER_CLAIMS), username=username)
     confirmation_code = serializer.validated_data['confirmation_code']
-    if user.confirmation_code != confirmation_code:
+    if not check_confirmation_code(user.pk, confirmation_code):
         return Response(
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST
         )
-    refresh = RefreshToken.for_user(user)
+    refresh = RoleRefreshToken.for_user(user)
     return Response({
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -147,6 +208,26 @@ def token(request):
         status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([AdminPermission])
+def export(request, table):
+    if table not in TABLE_NAMES:
+        raise Http404
+    fmt = request.query_params.get('fmt', 'csv')
+    if fmt not in FORMATS:
+        return Response(
+            {'fmt': [f'Допустимые форматы: {", ".join(FORMATS)}.']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    response = StreamingHttpResponse(
+        export_table(table, fmt, EXPORT_CHUNK_SIZE),
+        content_type=CONTENT_TYPES[fmt]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export_filename(table, fmt)}"')
+    return response
+
+
 class DeleteCreateListGenericViewSet(
         mixins.CreateModelMixin,
         mixins.DestroyModelMixin,
@@ -159,27 +240,61 @@ class DeleteCreateListGenericViewSet(
     lookup_field = 'slug'
 
 
-class GenreViewSet(DeleteCreateListGenericViewSet):
+class GenreViewSet(AnonymousListCacheMixin, DeleteCreateListGenericViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (AdminOrReadOnly,)
 
+    def get_cache_scopes(self):
+        return ['genres']
 
-class CategoryViewSet(DeleteCreateListGenericViewSet):
+
+class CategoryViewSet(AnonymousListCacheMixin,
+                      DeleteCreateListGenericViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def get_cache_scopes(self):
+        return ['categories']
+
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-id')
+class TitleViewSet(ConditionalGetMixin, FacetsMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('-id')
     serializer_class = TitlesGetSerializer
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_fields = ('category', 'genre', 'name', 'year')
     filterset_class = TitleFilter
 
+    def get_cache_scopes(self):
+        if self.action == 'retrieve':
+            return [f'title:{self.kwargs.get("pk")}', 'catalog']
+        return ['titles']
+
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH',):
             return TitlesPostSerializer
         return TitlesGetSerializer
+
+
+@require_GET
+def autocomplete(request):
+    # A plain Django view: the index answers in microseconds, DRF's
+    # authentication and content negotiation would take longer.
+    kinds = request.GET.getlist('type') or list(INDEXES)
+    errors = {}
+    if not set(kinds) <= set(INDEXES):
+        errors['type'] = [f'Допустимые типы: {", ".join(INDEXES)}']
+    limit = request.GET.get('limit', str(AUTOCOMPLETE_LIMIT))
+    if not limit.isdigit() or not 1 <= int(limit) <= AUTOCOMPLETE_MAX_LIMIT:
+        errors['limit'] = [
+            f'Укажите число от 1 до {AUTOCOMPLETE_MAX_LIMIT}']
+    if errors:
+        return JsonResponse(
+            errors, status=status.HTTP_400_BAD_REQUEST,
+            json_dumps_params={'ensure_ascii': False})
+    query = request.GET.get('q', '')
+    return JsonResponse(
+        {kind: INDEXES[kind].search(query, int(limit)) for kind in kinds},
+        json_dumps_params={'ensure_ascii': False})
@@ -24,12 +24,15 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
-    'api',
-    'reviews',
+    'api.apps.ApiConfig',
+    'reviews.apps.ReviewsConfig',
     'rest_framework_simplejwt',
 ]
 
 MIDDLEWARE = [
+    'api.profiling.ProfilingMiddleware',
+    'api.metrics.MetricsMiddleware',
+    'api.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,9 +70,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Сколько секунд запись ждёт, пока базу пишет другой запрос.
+        'OPTIONS': {'timeout': 20},
     }
 }
 
+# Выполняются для каждого нового соединения с SQLite: в режиме WAL
+# чтение не ждёт записи, а synchronous = NORMAL не делает fsync на
+# каждый коммит.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
 
 # Password validation
 
@@ -113,15 +125,67 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
 }
 
+# Кэш должен быть общим для всех процессов: в нём лежат версии данных
+# (api.cache), и запись в одном воркере должна сбрасывать ответы и ETag
+# во всех остальных, а load_data и generate_data - в запущенном сервере.
+# Файловый кэш общий для процессов одной машины; на нескольких машинах
+# нужен Redis или memcached. locmem у каждого процесса свой, с ним
+# воркеры отдают устаревшие данные без ограничения по времени.
+# Вытесненная версия только сбрасывает кэш, поэтому записей с запасом.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Сколько секунд хранить COUNT(*) для списков и с какого размера
+# нефильтрованной таблицы отдавать оценку вместо точного значения
+# (pg_class.reltuples, только PostgreSQL).
+PAGINATION_COUNT_CACHE_TIMEOUT = 30
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 100000
+
+# Сколько секунд хранить ответы на GET запросы анонимных пользователей.
+RESPONSE_CACHE_TIMEOUT = 60
+
+# Ширина интервала годов в подсчётах /api/v1/titles/?facets=true.
+FACET_YEAR_BUCKET = 10
+
+# Профилирование запросов (api.profiling): всех запросов или только
+# запросов администраторов с заголовком X-Profile. Доля запросов,
+# которые дополнительно снимаются cProfile, и каталог для их файлов.
+PROFILING_ENABLED = False
+PROFILING_TOP_QUERIES = 5
+PROFILING_SAMPLE_RATE = 0
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+
+# Метрики /metrics (api.metrics). При нескольких процессах (gunicorn)
+# каждый пишет свои значения в общий каталог не чаще раза в
+# METRICS_FLUSH_INTERVAL секунд; без каталога метрики у каждого свои.
+# Каталог очищается при старте мастера (clear_directory), а файлы
+# завершившихся воркеров складываются в archive.json
+# (mark_process_dead): обе функции вызывают хуки on_starting и
+# child_exit из gunicorn.conf.py. Другой сервер должен делать то же.
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR')
+METRICS_FLUSH_INTERVAL = 1
+METRICS_ALLOWED_IPS = ('127.0.0.1',)
+
+# Журнал медленных SQL запросов с планом выполнения (api.slow_queries):
+# порог в миллисекундах (None отключает) и файл журнала (None - stderr).
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_LOG_FILE = None
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=100),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -133,3 +197,13 @@ AUTH_USER_MODEL = "reviews.User"
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Срок действия кода подтверждения из письма, в секундах.
+CONFIRMATION_CODE_TIMEOUT = 24 * 60 * 60
+
+# Очередь писем (reviews.outbox), её разбирает команда send_outbox.
+# Неудачная отправка повторяется через OUTBOX_RETRY_DELAY секунд, каждый
+# раз вдвое дольше, но не дольше OUTBOX_MAX_RETRY_DELAY.
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_RETRY_DELAY = 3600
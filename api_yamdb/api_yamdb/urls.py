@@ -3,10 +3,12 @@ from django.urls import include, path
 from django.views.generic import TemplateView
 
 import api.urls
+from api.metrics import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(api.urls)),
+    path('metrics', metrics, name='metrics'),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
@@ -0,0 +1,17 @@
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+wsgi_app = 'api_yamdb.wsgi'
+
+
+def on_starting(server):
+    from api.metrics import clear_directory
+
+    clear_directory()
+
+
+def child_exit(server, worker):
+    from api.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
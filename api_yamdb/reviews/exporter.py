@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+
+from .importer import TABLES, TABLES_BY_NAME
+
+FORMATS = ('csv', 'ndjson')
+
+# Headers follow the files load_data reads; lookups are passed to
+# values_list(), so rows are read without building model instances.
+COLUMNS = {
+    'category': [('id', 'id'), ('name', 'name'), ('slug', 'slug')],
+    'genre': [('id', 'id'), ('name', 'name'), ('slug', 'slug')],
+    'users': [
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    ],
+    'titles': [
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'category_id'), ('description', 'description'),
+        ('rating', 'rating'),
+    ],
+    'genre_title': [
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    ],
+    'review': [
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    ],
+    'comments': [
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    ],
+}
+
+TABLE_NAMES = [table.name for table in TABLES]
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def export_filename(name, fmt):
+    filename = TABLES_BY_NAME[name].filename
+    if fmt == 'csv':
+        return filename
+    return filename.rsplit('.', 1)[0] + '.' + fmt
+
+
+def export_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def rows(name, chunk_size):
+    table = TABLES_BY_NAME[name]
+    lookups = [lookup for _, lookup in COLUMNS[name]]
+    queryset = table.model.objects.order_by('pk').values_list(*lookups)
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def export_csv(name, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in COLUMNS[name]])
+    # The header goes out before the query runs.
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    count = 0
+    for row in rows(name, chunk_size):
+        writer.writerow([export_value(value) for value in row])
+        count += 1
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_ndjson(name, chunk_size):
+    headers = [header for header, _ in COLUMNS[name]]
+    lines = []
+    for row in rows(name, chunk_size):
+        record = {
+            header: value.isoformat() if hasattr(value, 'isoformat')
+            else value
+            for header, value in zip(headers, row)
+        }
+        lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+        if len(lines) == chunk_size:
+            yield ''.join(lines)
+            lines = []
+    yield ''.join(lines)
+
+
+def export_table(name, fmt='csv', chunk_size=1000):
+    """Yields the table as text chunks of about chunk_size rows.
+
+    Only one chunk of rows is held in memory at a time.
+    """
+    if fmt == 'csv':
+        return export_csv(name, chunk_size)
+    return export_ndjson(name, chunk_size)
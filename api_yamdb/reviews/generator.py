@@ -0,0 +1,233 @@
+import csv
+import math
+import os
+import random
+from datetime import datetime, timezone
+from itertools import chain, count, islice
+
+from django.db import connection, transaction
+
+from .importer import TABLES_BY_NAME
+from .models import UserRole
+
+HEADERS = {
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'users': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+              'last_name'),
+    'titles': ('id', 'name', 'year', 'category', 'description'),
+    'genre_title': ('id', 'title_id', 'genre_id'),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+WORDS = (
+    'фильм книга песня сюжет герой финал автор режиссёр актёр музыка '
+    'история мир время любовь дорога город ночь память война мечта'
+).split()
+SCORES = range(1, 11)
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 7, 10, 12, 10, 8)
+FIRST_DATE = 1262304000  # 2010-01-01
+DATE_SPAN = 15 * 365 * 24 * 3600
+# Values of these fields are passed to the database as they are.
+PLAIN_TYPES = {
+    'AutoField', 'BigAutoField', 'BigIntegerField', 'BooleanField',
+    'CharField', 'ForeignKey', 'IntegerField', 'PositiveIntegerField',
+    'SlugField', 'TextField',
+}
+
+
+class Generator:
+    """Reproducible synthetic catalog.
+
+    Every table has its own random stream derived from the seed, so a
+    table comes out the same whether or not the others are generated.
+    Reviews per title follow a Zipf law: the title of rank r gets a
+    share proportional to 1 / r ** zipf of all reviews, up to one
+    review per user.
+    """
+
+    def __init__(self, seed=0, users=1000, titles=1000, genres=20,
+                 categories=10, genres_per_title=2, reviews_per_title=10,
+                 zipf=1.0, comments_per_review=1.0):
+        self.seed = seed
+        self.users = users
+        self.titles = titles
+        self.genres = genres
+        self.categories = categories
+        self.genres_per_title = min(genres_per_title, genres)
+        self.reviews_per_title = reviews_per_title
+        self.zipf = zipf
+        self.comments_per_review = comments_per_review
+        self._review_counts = None
+
+    def random(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def texts(self, rng, count=256):
+        return [
+            ' '.join(rng.choices(WORDS, k=rng.randint(3, 12))).capitalize()
+            for _ in range(count)
+        ]
+
+    def date(self, fraction):
+        timestamp = FIRST_DATE + int(fraction * DATE_SPAN)
+        return datetime.fromtimestamp(timestamp, timezone.utc)
+
+    @property
+    def review_counts(self):
+        """Number of reviews of every title, in title id order."""
+        if self._review_counts is None:
+            weights = [
+                1 / rank ** self.zipf for rank in range(1, self.titles + 1)]
+            total = min(round(self.reviews_per_title * self.titles),
+                        self.users * self.titles)
+            # A title has at most one review per user. The reviews the
+            # top ranks can't take go to the rest, in proportion to
+            # their weights, so the mean stays reviews_per_title.
+            capped, rest = 0, sum(weights)
+            while (capped < self.titles and weights[capped]
+                   * (total - capped * self.users) / rest > self.users):
+                rest -= weights[capped]
+                capped += 1
+            scale = (total - capped * self.users) / rest if rest else 0
+            counts = [self.users] * capped
+            # Rounding the running sum keeps the total exact.
+            done = 0
+            for weight in weights[capped:]:
+                counts.append(round(done + weight * scale) - round(done))
+                done += weight * scale
+            self.random('review_counts').shuffle(counts)
+            self._review_counts = counts
+        return self._review_counts
+
+    def category_rows(self):
+        for pk in range(1, self.categories + 1):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genre_rows(self):
+        for pk in range(1, self.genres + 1):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def users_rows(self):
+        rng = self.random('users')
+        roles = (UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN)
+        for pk in range(1, self.users + 1):
+            role = rng.choices(roles, (97, 2, 1))[0]
+            yield (pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '',
+                   '', '')
+
+    def titles_rows(self):
+        rng = self.random('titles')
+        texts = self.texts(rng)
+        for pk in range(1, self.titles + 1):
+            yield (pk, f'Произведение {pk}', rng.randint(1900, 2024),
+                   rng.randint(1, self.categories) if self.categories
+                   else '', rng.choice(texts))
+
+    def genre_title_rows(self):
+        rng = self.random('genre_title')
+        genres = range(1, self.genres + 1)
+        pk = 0
+        for title_id in range(1, self.titles + 1):
+            for genre_id in rng.sample(genres, self.genres_per_title):
+                pk += 1
+                yield pk, title_id, genre_id
+
+    def review_rows(self):
+        rng = self.random('review')
+        texts = self.texts(rng)
+        authors = range(1, self.users + 1)
+        # Hot loop: bound methods and plain random() instead of choice().
+        rand, date, sample = rng.random, self.date, rng.sample
+        pk = 0
+        for title_id, reviews in enumerate(self.review_counts, 1):
+            scores = rng.choices(SCORES, SCORE_WEIGHTS, k=reviews)
+            for author, score in zip(sample(authors, reviews), scores):
+                pk += 1
+                yield (pk, title_id, texts[int(rand() * len(texts))],
+                       author, score, date(rand()))
+
+    def comments_rows(self):
+        if not self.comments_per_review:
+            return
+        rng = self.random('comments')
+        texts = self.texts(rng)
+        # Geometric number of comments with the requested mean.
+        rate = math.log(1 + 1 / self.comments_per_review)
+        rand, date, expovariate = rng.random, self.date, rng.expovariate
+        pk = 0
+        for review_id in range(1, sum(self.review_counts) + 1):
+            for _ in range(int(expovariate(rate))):
+                pk += 1
+                yield (pk, review_id, texts[int(rand() * len(texts))],
+                       int(rand() * self.users) + 1, date(rand()))
+
+    def rows(self, name):
+        """Yields the rows of a table as tuples in HEADERS order."""
+        return getattr(self, f'{name}_rows')()
+
+    def write_csv(self, name, directory):
+        path = os.path.join(directory, TABLES_BY_NAME[name].filename)
+        counter = count()
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(HEADERS[name])
+            writer.writerows(
+                row for row, _ in zip(self.rows(name), counter))
+        return next(counter)
+
+    def insert(self, name, batch_size):
+        """Inserts the rows with executemany(), one transaction per batch.
+
+        Building and preparing a model instance per row costs several
+        times more than the INSERT itself, so only values that need it
+        go through the field's get_db_prep_save(), and columns missing
+        from the row get the field default, prepared once.
+        """
+        table = TABLES_BY_NAME[name]
+        fields = table.model._meta.concrete_fields
+        records = (
+            table.mapper(dict(zip(HEADERS[name], row)))
+            for row in self.rows(name))
+        first = next(records, None)
+        if first is None:
+            return 0
+        columns = []
+        for field in fields:
+            if field.attname in first:
+                columns.append((field.attname, prepare(field), None))
+            else:
+                default = field.get_db_prep_save(
+                    field.get_default(), connection)
+                columns.append((None, None, default))
+        quote = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(table.model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        records = chain([first], records)
+        rows = 0
+        while True:
+            batch = [
+                [
+                    default if attname is None
+                    else convert(record[attname]) if convert
+                    else record[attname]
+                    for attname, convert, default in columns
+                ]
+                for record in islice(records, batch_size)
+            ]
+            if not batch:
+                return rows
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+            rows += len(batch)
+
+
+def prepare(field):
+    """Converter of a value to its database form, None if not needed."""
+    if field.get_internal_type() in PLAIN_TYPES:
+        return None
+    return lambda value: field.get_db_prep_save(value, connection)
@@ -0,0 +1,342 @@
+import csv
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+import django
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from .models import (
+    Category, Comment, Genre, ImportCheckpoint, Review, Title, User, UserRole)
+
+Table = namedtuple('Table', 'name model filename mapper')
+
+
+def optional_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def map_category(row):
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+map_genre = map_category
+
+
+def map_user(row):
+    role = row.get('role') or UserRole.USER
+    return {
+        'id': int(row['id']),
+        'username': row['username'],
+        'email': row['email'],
+        'role': role,
+        'bio': row.get('bio') or '',
+        'first_name': row.get('first_name') or '',
+        'last_name': row.get('last_name') or '',
+        'is_staff': role == UserRole.MODERATOR,
+        'is_superuser': role == UserRole.ADMIN,
+    }
+
+
+def map_title(row):
+    return {
+        'id': int(row['id']),
+        'name': row['name'],
+        'year': optional_int(row.get('year')),
+        'category_id': optional_int(row.get('category')),
+        'description': row.get('description') or None,
+    }
+
+
+def map_genre_title(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'genre_id': int(row['genre_id']),
+    }
+
+
+def map_review(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'author_id': int(row['author']),
+        'text': row['text'],
+        'score': int(row['score']),
+        'pub_date': row['pub_date'],
+    }
+
+
+def map_comment(row):
+    return {
+        'id': int(row['id']),
+        'review_id': int(row['review_id']),
+        'author_id': int(row['author']),
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+    }
+
+
+# Parents come before the tables that reference them.
+TABLES = [
+    Table('category', Category, 'category.csv', map_category),
+    Table('genre', Genre, 'genre.csv', map_genre),
+    Table('users', User, 'users.csv', map_user),
+    Table('titles', Title, 'titles.csv', map_title),
+    Table('genre_title', Title.genre.through, 'genre_title.csv',
+          map_genre_title),
+    Table('review', Review, 'review.csv', map_review),
+    Table('comments', Comment, 'comments.csv', map_comment),
+]
+
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+# Parsed batches a worker may hold ahead of the writer, per table.
+QUEUE_BATCHES = 4
+
+
+def dependencies(tables):
+    """Maps each table name to the names of the tables it references."""
+    names = {table.model: table.name for table in tables}
+    return {
+        table.name: {
+            names[field.related_model]
+            for field in table.model._meta.concrete_fields
+            if field.is_relation and field.related_model in names
+            and field.related_model is not table.model
+        }
+        for table in tables
+    }
+
+
+def dependency_order(tables):
+    graph = dependencies(tables)
+    ordered, done = [], set()
+    while len(ordered) < len(tables):
+        ready = [
+            table for table in tables
+            if table.name not in done and graph[table.name] <= done
+        ]
+        if not ready:
+            raise ValueError('Circular dependency between tables.')
+        for table in ready:
+            ordered.append(table)
+            done.add(table.name)
+    return ordered
+
+
+def read_batches(path, mapper, batch_size, offset=0):
+    """Yields (mapped rows, byte offset just past the last of them).
+
+    The file is read line by line in binary mode so that the position
+    after every CSV record is known and an import can resume from it.
+    """
+    with open(path, 'rb') as csv_file:
+        header = next(csv.reader([csv_file.readline().decode('utf-8-sig')]))
+        if offset:
+            csv_file.seek(offset)
+        lines = iter(lambda: csv_file.readline().decode('utf-8'), '')
+        records = (values for values in csv.reader(lines) if values)
+        while True:
+            batch = [
+                mapper(dict(zip(header, values)))
+                for values in islice(records, batch_size)
+            ]
+            if not batch:
+                return
+            yield batch, csv_file.tell()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as data:
+        for chunk in iter(lambda: data.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_checkpoint(path):
+    """Checkpoint of path; a file whose content changed starts over."""
+    content_hash = file_hash(path)
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        filename=os.path.basename(path),
+        defaults={'content_hash': content_hash},
+    )
+    if checkpoint.content_hash != content_hash:
+        checkpoint.content_hash = content_hash
+        checkpoint.offset = checkpoint.rows = 0
+        checkpoint.completed = False
+        checkpoint.save()
+    return checkpoint
+
+
+@contextmanager
+def keep_dates(model):
+    """Lets bulk_create store pub_date from the file, not the import time."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def upsert(model, objs, fields):
+    existing = set(model.objects.filter(
+        pk__in=[obj.pk for obj in objs]).values_list('pk', flat=True))
+    updated = [obj for obj in objs if obj.pk in existing]
+    if updated:
+        model.objects.bulk_update(updated, fields)
+    return [obj for obj in objs if obj.pk not in existing]
+
+
+def write_batch(model, rows, offset=None, checkpoint=None, update=False):
+    """Writes one batch and advances the checkpoint in one transaction."""
+    with transaction.atomic(), keep_dates(model):
+        objs = [model(**row) for row in rows]
+        if update:
+            fields = [name for name in rows[0] if name != 'id']
+            objs = upsert(model, objs, fields)
+        model.objects.bulk_create(objs)
+        if checkpoint is not None:
+            checkpoint.offset = offset
+            checkpoint.rows += len(rows)
+            checkpoint.save()
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def finish(checkpoint):
+    if checkpoint is not None:
+        checkpoint.completed = True
+        checkpoint.save()
+
+
+def import_table(table, path, batch_size, progress=None, checkpoint=None,
+                 update=False):
+    started = time.monotonic()
+    rows = 0
+    offset = checkpoint.offset if checkpoint else 0
+    for batch, offset in read_batches(path, table.mapper, batch_size, offset):
+        write_batch(table.model, batch, offset, checkpoint, update)
+        rows += len(batch)
+        if progress:
+            progress(table, rows, time.monotonic() - started, False)
+    finish(checkpoint)
+    if progress:
+        progress(table, rows, time.monotonic() - started, True)
+    return rows
+
+
+def import_tables(jobs, batch_size, progress=None, update=False):
+    """Imports (table, path, checkpoint) jobs one by one, parents first."""
+    order = dependency_order([table for table, _, _ in jobs])
+    by_name = {table.name: (path, checkpoint)
+               for table, path, checkpoint in jobs}
+    total = 0
+    for table in order:
+        path, checkpoint = by_name[table.name]
+        total += import_table(
+            table, path, batch_size, progress, checkpoint, update)
+    return total
+
+
+worker_queues = {}
+
+
+def setup_worker(queues):
+    django.setup()
+    worker_queues.update(queues)
+
+
+def parse_file(name, path, batch_size, offset):
+    table = TABLES_BY_NAME[name]
+    queue = worker_queues[name]
+    try:
+        for batch in read_batches(path, table.mapper, batch_size, offset):
+            queue.put(batch)
+    except Exception as error:
+        queue.put(error)
+    else:
+        queue.put(None)
+
+
+def drain(queue):
+    for batch in iter(queue.get, None):
+        if isinstance(batch, Exception):
+            return
+
+
+def import_tables_parallel(jobs, batch_size, workers, progress=None,
+                           update=False):
+    """Parses CSV files in a process pool while this process inserts.
+
+    Files are submitted in dependency order and the writer drains them
+    in the same order, so a table is written only after its parents and
+    a busy worker never waits on a table that has not started yet.
+    """
+    order = dependency_order([table for table, _, _ in jobs])
+    by_name = {table.name: (path, checkpoint)
+               for table, path, checkpoint in jobs}
+    queues = {
+        table.name: multiprocessing.Queue(QUEUE_BATCHES) for table in order
+    }
+    total = 0
+    with ProcessPoolExecutor(
+        workers, initializer=setup_worker, initargs=(queues,)
+    ) as pool:
+        for table in order:
+            path, checkpoint = by_name[table.name]
+            pool.submit(parse_file, table.name, path, batch_size,
+                        checkpoint.offset if checkpoint else 0)
+        pending = list(order)
+        # Set once the current table's worker has reported an error and
+        # stopped writing to its queue.
+        worker_failed = False
+        try:
+            while pending:
+                table = pending[0]
+                checkpoint = by_name[table.name][1]
+                started = time.monotonic()
+                rows = 0
+                for batch in iter(queues[table.name].get, None):
+                    if isinstance(batch, Exception):
+                        worker_failed = True
+                        raise batch
+                    batch, offset = batch
+                    write_batch(
+                        table.model, batch, offset, checkpoint, update)
+                    rows += len(batch)
+                    if progress:
+                        progress(
+                            table, rows, time.monotonic() - started, False)
+                pending.pop(0)
+                finish(checkpoint)
+                if progress:
+                    progress(table, rows, time.monotonic() - started, True)
+                total += rows
+        except BaseException:
+            # Let every worker run to the end so the pool can shut down,
+            # including the one parsing the table whose write failed: it
+            # would block on its full queue forever.
+            for table in pending[1 if worker_failed else 0:]:
+                drain(queues[table.name])
+            raise
+    return total
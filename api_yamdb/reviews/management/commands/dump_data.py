@@ -0,0 +1,46 @@
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.exporter import (
+    FORMATS, TABLE_NAMES, export_filename, export_table)
+
+
+class Command(BaseCommand):
+    help = "Dumps the YaMDb catalog to CSV or NDJSON files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', required=True,
+            help='Directory to write the files to.'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv', dest='fmt',
+            help='Output format, CSV files are readable by load_data.'
+        )
+        parser.add_argument(
+            '--table', action='append', dest='tables', choices=TABLE_NAMES,
+            help='Dump only the given table (can be repeated).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Rows fetched from the database at a time.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        os.makedirs(options['path'], exist_ok=True)
+        started = time.monotonic()
+        for name in options['tables'] or TABLE_NAMES:
+            path = os.path.join(
+                options['path'], export_filename(name, options['fmt']))
+            with open(path, 'w', encoding='utf-8', newline='') as output:
+                for chunk in export_table(
+                    name, options['fmt'], options['chunk_size']
+                ):
+                    output.write(chunk)
+            self.stdout.write(f'{name}: written to {path}')
+        seconds = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Dumped in {seconds:.2f} s.'))
@@ -0,0 +1,22 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = "Recalculates stored title ratings from reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--title', type=int, action='append', dest='titles',
+            help='Recalculate only the given title id (can be repeated).'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Title.objects.all()
+        if options['titles']:
+            queryset = queryset.filter(pk__in=options['titles'])
+        with transaction.atomic():
+            updated = queryset.recalc_rating()
+        self.stdout.write(f'Recalculated rating for {updated} titles.')
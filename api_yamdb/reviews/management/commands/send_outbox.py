@@ -0,0 +1,39 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.outbox import claim, send_batch
+
+
+class Command(BaseCommand):
+    help = "Sends the emails queued in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Emails sent over one mail server connection.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when no emails are due instead of polling.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Seconds to wait before polling an empty outbox again.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        try:
+            while True:
+                emails = claim(options['batch_size'])
+                if emails:
+                    sent = send_batch(emails)
+                    self.stdout.write(f'Sent {sent} of {len(emails)} emails.')
+                elif options['once']:
+                    return
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_comment_review_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='SHA-256 содержимого')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Загружено байт')),
+                ('rows', models.BigIntegerField(default=0, verbose_name='Загружено строк')),
+                ('completed', models.BooleanField(default=False, verbose_name='Загружен полностью')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлён')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка импорта',
+                'verbose_name_plural': 'Контрольные точки импорта',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+SEARCH_TABLE = 'reviews_title_search'
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {SEARCH_TABLE} '
+        f"USING fts5(name, description, tokenize = 'trigram')")
+    # Matches in the name rank ten times higher than in the description.
+    schema_editor.execute(
+        f'INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) '
+        f"VALUES ('rank', 'bm25(10.0, 1.0)')")
+    schema_editor.execute(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+        f"SELECT id, name, coalesce(description, '') FROM reviews_title")
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -1,7 +1,11 @@
 from django.contrib.auth.models import (
     AbstractUser, BaseUserManager, PermissionsMixin)
 from django.db import models
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 
 from .validators import validate_year
 
@@ -66,19 +70,34 @@ class User(AbstractUser, PermissionsMixin):
         verbose_name='Имя'
     )
     email = models.EmailField(unique=True, verbose_name='Электронная почта')
-    confirmation_code = models.CharField(
-        max_length=20,
-        default='0000',
-        verbose_name='Код подтверждения'
-    )
     is_superuser = models.BooleanField(default=False)
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
     objects = UserManager()
 
+    # Username as last read or saved: reviews and comments show it, so
+    # api.signals drops their cached responses when it changes.
+    loaded_username = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'username' in field_names:
+            instance.loaded_username = values[
+                field_names.index('username')]
+        return instance
+
     def __str__(self):
         return self.username
 
+    @property
+    def is_admin(self):
+        return self.role == UserRole.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == UserRole.MODERATOR
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
@@ -112,6 +131,36 @@ class Genre(models.Model):
         return str(self.name)
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def change_rating(self, score_delta, count_delta):
+        new_sum = F('rating_sum') + score_delta
+        new_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=Case(
+                When(rating_count=-count_delta, then=Value(None)),
+                default=Cast(new_sum, FloatField()) / new_count,
+                output_field=FloatField(),
+            ),
+        )
+
+    def recalc_rating(self):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        rating_sum = reviews.annotate(total=Sum('score')).values('total')
+        rating_count = reviews.annotate(total=Count('id')).values('total')
+        rating = reviews.annotate(
+            average=Avg('score', output_field=FloatField())).values('average')
+        # One statement, so the three columns come from the same reviews.
+        return self.update(
+            rating_sum=Coalesce(Subquery(rating_sum), 0),
+            rating_count=Coalesce(Subquery(rating_count), 0),
+            rating=Subquery(rating, output_field=FloatField()),
+        )
+
+
 class Title(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField('Жанр', max_length=256, unique=True)
@@ -134,11 +183,22 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         related_name='category'
     )
+    rating_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+    rating_count = models.PositiveIntegerField('Число оценок', default=0)
+    rating = models.FloatField('Рейтинг', null=True, blank=True)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ['-id']
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'),
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['rating'], name='title_rating_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -203,8 +263,51 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date'], name='comment_review_date_idx'
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class ImportCheckpoint(models.Model):
+    filename = models.CharField('Файл', max_length=255, unique=True)
+    content_hash = models.CharField('SHA-256 содержимого', max_length=64)
+    offset = models.BigIntegerField('Загружено байт', default=0)
+    rows = models.BigIntegerField('Загружено строк', default=0)
+    completed = models.BooleanField('Загружен полностью', default=False)
+    updated = models.DateTimeField('Обновлён', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+
+    def __str__(self):
+        return self.filename
+
+
+class OutboxEmail(models.Model):
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    to = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['send_after'], name='outbox_send_after_idx'),
+        ]
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
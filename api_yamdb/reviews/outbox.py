@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+OUTBOX_RETRY_DELAY = getattr(settings, 'OUTBOX_RETRY_DELAY', 30)
+OUTBOX_MAX_RETRY_DELAY = getattr(settings, 'OUTBOX_MAX_RETRY_DELAY', 3600)
+# How long a worker owns the rows it claimed before others may retry them.
+OUTBOX_LEASE = getattr(settings, 'OUTBOX_LEASE', 300)
+
+
+def enqueue(subject, body, from_email, to):
+    return OutboxEmail.objects.create(
+        subject=subject, body=body, from_email=from_email, to=to)
+
+
+def pending():
+    return OutboxEmail.objects.filter(attempts__lt=OUTBOX_MAX_ATTEMPTS)
+
+
+def retry_delay(attempts):
+    return min(
+        OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), OUTBOX_MAX_RETRY_DELAY)
+
+
+def claim(batch_size):
+    """Takes due emails and hides them from other workers for the lease."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            pending().filter(send_after__lte=now)
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(send_after=now + timedelta(seconds=OUTBOX_LEASE))
+    return emails
+
+
+def failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    email.send_after = timezone.now() + timedelta(
+        seconds=retry_delay(email.attempts))
+    email.save(update_fields=['attempts', 'last_error', 'send_after'])
+
+
+def send_batch(emails):
+    """Sends the emails over one connection, returns how many were sent.
+
+    Each message goes out separately, so one bad address doesn't fail
+    the rest of the batch; sent emails are deleted from the outbox.
+    """
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            failed(email, error)
+        return 0
+    sent = []
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, [email.to])
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                failed(email, error)
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+        OutboxEmail.objects.filter(pk__in=sent).delete()
+    return len(sent)
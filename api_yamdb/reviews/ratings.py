@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+
+from .models import Review, Title
+
+
+def review_saved(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'score' not in update_fields:
+        return
+    titles = Title.objects.filter(pk=instance.title_id)
+    if created:
+        titles.change_rating(instance.score, 1)
+    else:
+        # A recount of the one title rather than a move by the
+        # difference from the score the instance was loaded with:
+        # that score is stale when another edit of the review got in
+        # first.
+        titles.recalc_rating()
+
+
+def review_deleted(sender, instance, **kwargs):
+    # Also runs for reviews deleted by cascade, with their author or
+    # title.
+    Title.objects.filter(pk=instance.title_id).change_rating(
+        -instance.score, -1)
+
+
+def connect():
+    post_save.connect(
+        review_saved, sender=Review, dispatch_uid='reviews_review_saved')
+    post_delete.connect(
+        review_deleted, sender=Review, dispatch_uid='reviews_review_deleted')
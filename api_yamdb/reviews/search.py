@@ -0,0 +1,84 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+from .models import Title
+
+# FTS5 table with the trigram tokenizer, made by migration 0007. It
+# finds any substring of MIN_TERM_LENGTH or more characters without
+# scanning the titles.
+SEARCH_TABLE = 'reviews_title_search'
+MIN_TERM_LENGTH = 3
+INDEXED_FIELDS = {'name', 'description'}
+
+
+def is_indexed(using):
+    return connections[using].vendor == 'sqlite'
+
+
+def match_expression(words):
+    # Quoted terms are plain substrings, not FTS5 query syntax.
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def search_titles(queryset, query):
+    """Titles with every word of query in the name or description.
+
+    On SQLite the best matches come first, by bm25 with the name
+    weighing more than the description.
+    """
+    words = query.split()
+    short = [word for word in words if len(word) < MIN_TERM_LENGTH]
+    if not is_indexed(queryset.db):
+        short = words
+    for word in short:
+        queryset = queryset.filter(
+            Q(name__icontains=word) | Q(description__icontains=word))
+    if short == words:
+        return queryset
+    return queryset.extra(
+        select={'search_rank': f'{SEARCH_TABLE}.rank'},
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE}.rowid = {Title._meta.db_table}.id',
+               f'{SEARCH_TABLE} MATCH %s'],
+        params=[match_expression(
+            word for word in words if word not in short)],
+    ).order_by('search_rank', '-id')
+
+
+def index_title(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and not INDEXED_FIELDS & set(update_fields):
+        return
+    if is_indexed(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {SEARCH_TABLE} '
+                f'(rowid, name, description) VALUES (%s, %s, %s)',
+                [instance.pk, instance.name, instance.description or ''])
+
+
+def unindex_title(sender, instance, using, **kwargs):
+    if is_indexed(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                [instance.pk])
+
+
+def rebuild_index(using='default'):
+    """Reindexes all titles, for bulk loads that send no signals."""
+    if not is_indexed(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            f'SELECT id, name, coalesce(description, \'\') '
+            f'FROM {Title._meta.db_table}')
+
+
+def connect():
+    post_save.connect(
+        index_title, sender=Title, dispatch_uid='reviews_index_title')
+    post_delete.connect(
+        unindex_title, sender=Title, dispatch_uid='reviews_unindex_title')
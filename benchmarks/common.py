@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def measure(client, method, url, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        if response.streaming:
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+        elapsed = time.perf_counter() - started
+    return {
+        'status': response.status_code,
+        'seconds': elapsed,
+        'queries': [query['sql'] for query in context.captured_queries],
+        'bytes': len(content),
+    }
+
+
+def percentiles(samples):
+    timings = [sample['seconds'] * 1000 for sample in samples]
+    if len(timings) < 2:
+        return {'p50': timings[0], 'p95': timings[0], 'p99': timings[0]}
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def token_client(user):
+    from rest_framework.test import APIClient
+
+    from api.tokens import RoleRefreshToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=(
+        f'Bearer {RoleRefreshToken.for_user(user).access_token}'))
+    return client
+
+
+def report(title, samples):
+    timings = [sample['seconds'] * 1000 for sample in samples]
+    queries = [len(sample['queries']) for sample in samples]
+    print(
+        f'\n{title}: {len(samples)} requests, '
+        f'median {statistics.median(timings):.2f} ms, '
+        f'{statistics.mean(queries):.2f} queries/request'
+    )
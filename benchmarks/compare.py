@@ -0,0 +1,39 @@
+"""Compares two endpoint benchmark results.
+
+    python -m benchmarks.compare OLD.json NEW.json
+"""
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as results:
+        return json.load(results)['routes']
+
+
+def change(old, new):
+    if not old:
+        return '     n/a'
+    return f'{(new - old) / old * 100:+7.1f}%'
+
+
+def compare(old, new):
+    print(f'{"route":<28} {"p50 ms":>16} {"p95 ms":>16} {"queries":>9}')
+    for label, result in new.items():
+        before = old.get(label)
+        if before is None:
+            print(f'{label:<28} new')
+            continue
+        columns = [
+            f'{result[key]:8.2f}{change(before[key], result[key])}'
+            for key in ('p50_ms', 'p95_ms')
+        ]
+        queries = result['queries_max'] - before['queries_max']
+        print(f'{label:<28} {" ".join(columns)} '
+              f'{result["queries_max"]:4} {queries:+4}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    compare(load(sys.argv[1]), load(sys.argv[2]))
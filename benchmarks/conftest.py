@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root_dir)
+
+pytest_plugins = [
+    'tests.fixtures.fixture_user',
+]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(tmp_path_factory):
+    from django.conf import settings
+
+    # Concurrent connections and WAL need a database file, the default
+    # test database lives in memory.
+    settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = str(
+        tmp_path_factory.mktemp('db') / 'benchmarks.sqlite3')
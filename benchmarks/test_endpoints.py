@@ -0,0 +1,288 @@
+import json
+import os
+import statistics
+from collections import namedtuple
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import resolve
+from rest_framework.test import APIClient
+
+from .common import measure, percentiles, token_client
+
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', 30))
+TITLES = int(os.environ.get('BENCH_TITLES', 2000))
+USERS = int(os.environ.get('BENCH_USERS', 2000))
+REVIEWS_PER_TITLE = float(os.environ.get('BENCH_REVIEWS_PER_TITLE', 10))
+RESULTS_DIR = os.environ.get(
+    'BENCH_RESULTS', os.path.join(os.path.dirname(__file__), 'results'))
+
+# prepare(round) builds (client, url, data) outside the timed request,
+# budget is the most queries a single request may run.
+Route = namedtuple('Route', 'label method prepare status budget')
+
+
+class Catalog:
+    """Objects of the generated dataset the routes point at."""
+
+    def __init__(self):
+        from reviews.models import Category, Genre, Review, Title
+
+        self.title = Title.objects.order_by('-rating_count').first()
+        self.review = Review.objects.filter(title=self.title).order_by(
+            'id').first()
+        self.comment = self.review.comments.create(
+            author_id=self.review.author_id, text='Комментарий')
+        self.genre = Genre.objects.first()
+        self.category = Category.objects.first()
+        self.reader = self.new_user('bench_reader')
+        moderator = self.new_user('bench_moderator', role='moderator')
+        admin = self.new_user('bench_admin', role='admin', is_superuser=True)
+        self.anonymous = APIClient()
+        self.reader_client = token_client(self.reader)
+        self.moderator_client = token_client(moderator)
+        self.admin_client = token_client(admin)
+
+    @property
+    def title_url(self):
+        return f'/api/v1/titles/{self.title.id}/'
+
+    @property
+    def review_url(self):
+        return f'{self.title_url}reviews/{self.review.id}/'
+
+    def new_user(self, prefix, number='', **kwargs):
+        from reviews.models import User
+
+        return User.objects.create(
+            username=f'{prefix}{number}', email=f'{prefix}{number}@yamdb.fake',
+            **kwargs)
+
+    def token_request(self, number):
+        from api.tokens import make_confirmation_code
+
+        user = self.new_user('bench_token', number)
+        return {'username': user.username,
+                'confirmation_code': make_confirmation_code(user.pk)}
+
+    def new_review(self, number):
+        return self.title.reviews.create(
+            author=self.new_user('bench_author', number), text='Текст',
+            score=5)
+
+    def new_comment(self, number):
+        return self.review.comments.create(
+            author=self.reader, text=f'Комментарий {number}')
+
+
+def read(label, client, url, budget, data=None):
+    return Route(
+        label, 'get', lambda number: (client, url, data), 200, budget)
+
+
+def routes(catalog):
+    from reviews.models import Category, Genre, Title
+
+    c = catalog
+    reader, moderator, admin = (
+        c.reader_client, c.moderator_client, c.admin_client)
+    titles = '/api/v1/titles/'
+    reviews = f'{c.title_url}reviews/'
+    comments = f'{c.review_url}comments/'
+    return [
+        read('titles list, anonymous', c.anonymous, titles, 0),
+        read('titles list', reader, titles, 2),
+        read('titles list, genre filter', reader, titles, 2,
+             {'genre': c.genre.slug}),
+        read('title', reader, c.title_url, 2),
+        Route('create title', 'post', lambda n: (admin, titles, {
+            'name': f'Бенчмарк {n}', 'year': 2000,
+            'genre': [c.genre.slug], 'category': c.category.slug,
+        }), 201, 11),
+        Route('update title', 'patch', lambda n: (
+            admin, c.title_url, {'description': f'Описание {n}'}
+        ), 200, 6),
+        Route('delete title', 'delete', lambda n: (
+            admin, f'{titles}{Title.objects.create(name=f"Удалить {n}").id}/',
+            None
+        ), 204, 8),
+
+        read('reviews list', reader, reviews, 2),
+        read('reviews list, cursor', reader, reviews, 2,
+             {'pagination': 'cursor'}),
+        read('review', reader, c.review_url, 2),
+        Route('create review', 'post', lambda n: (
+            token_client(c.new_user('bench_reviewer', n)), reviews,
+            {'text': 'Текст', 'score': 7}
+        ), 201, 7),
+        Route('update review', 'patch', lambda n: (
+            moderator, c.review_url, {'text': f'Текст {n}'}
+        ), 200, 6),
+        Route('delete review', 'delete', lambda n: (
+            moderator, f'{reviews}{c.new_review(n).id}/', None
+        ), 204, 7),
+
+        read('comments list', reader, comments, 2),
+        read('comments list, expanded', reader, comments, 2,
+             {'expand': 'review'}),
+        read('comment', reader, f'{comments}{c.comment.id}/', 2),
+        Route('create comment', 'post', lambda n: (
+            reader, comments, {'text': f'Комментарий {n}'}
+        ), 201, 3),
+        Route('update comment', 'patch', lambda n: (
+            moderator, f'{comments}{c.comment.id}/', {'text': f'Текст {n}'}
+        ), 200, 4),
+        Route('delete comment', 'delete', lambda n: (
+            moderator, f'{comments}{c.new_comment(n).id}/', None
+        ), 204, 5),
+
+        read('categories list', reader, '/api/v1/categories/', 1),
+        Route('create category', 'post', lambda n: (
+            admin, '/api/v1/categories/',
+            {'name': f'Категория бенчмарка {n}', 'slug': f'bench-{n}'}
+        ), 201, 4),
+        Route('delete category', 'delete', lambda n: (
+            admin, '/api/v1/categories/{}/'.format(Category.objects.create(
+                name=f'Удалить {n}', slug=f'bench-delete-{n}').slug), None
+        ), 204, 5),
+        read('genres list', reader, '/api/v1/genres/', 1),
+        Route('create genre', 'post', lambda n: (
+            admin, '/api/v1/genres/',
+            {'name': f'Жанр бенчмарка {n}', 'slug': f'bench-{n}'}
+        ), 201, 4),
+        Route('delete genre', 'delete', lambda n: (
+            admin, '/api/v1/genres/{}/'.format(Genre.objects.create(
+                name=f'Удалить {n}', slug=f'bench-delete-{n}').slug), None
+        ), 204, 5),
+
+        read('users list', admin, '/api/v1/users/', 2),
+        read('user', admin, '/api/v1/users/bench_reader/', 2),
+        Route('update user', 'patch', lambda n: (
+            admin, '/api/v1/users/bench_reader/', {'bio': f'Био {n}'}
+        ), 200, 3),
+        Route('delete user', 'delete', lambda n: (
+            admin, '/api/v1/users/{}/'.format(
+                c.new_user('bench_deleted', n).username), None
+        ), 204, 9),
+        read('me', reader, '/api/v1/users/me/', 2),
+        Route('update me', 'patch', lambda n: (
+            reader, '/api/v1/users/me/', {'bio': f'Био {n}'}
+        ), 200, 3),
+
+        Route('signup', 'post', lambda n: (
+            c.anonymous, '/api/v1/auth/signup/',
+            {'username': f'bench_signup{n}',
+             'email': f'bench_signup{n}@yamdb.fake'}
+        ), 200, 3),
+        Route('token', 'post', lambda n: (
+            c.anonymous, '/api/v1/auth/token/', c.token_request(n)
+        ), 200, 1),
+        read('export titles', admin, '/api/v1/export/titles/', 2),
+        read('autocomplete', c.anonymous, '/api/v1/autocomplete/', 0,
+             {'q': 'произв'}),
+    ]
+
+
+def route_names():
+    from api.urls import urlpatterns
+
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if hasattr(pattern, 'url_patterns'):
+                walk(pattern.url_patterns)
+            else:
+                names.add(pattern.name)
+
+    walk(urlpatterns)
+    return names
+
+
+def run(route):
+    samples = []
+    for number in range(ROUNDS + 1):
+        client, url, data = route.prepare(number)
+        kwargs = {'data': data} if data is not None else {}
+        sample = measure(client, route.method, url, **kwargs)
+        sample['url'] = url
+        assert sample['status'] == route.status, (
+            f'{route.label}: {route.method.upper()} {url} returned '
+            f'{sample["status"]}, expected {route.status}'
+        )
+        # The first round warms up caches and is not reported.
+        if number:
+            samples.append(sample)
+    return samples
+
+
+def summarize(route, samples):
+    queries = [len(sample['queries']) for sample in samples]
+    worst = max(samples, key=lambda sample: len(sample['queries']))
+    return {
+        'route': resolve(samples[0]['url'].split('?')[0]).url_name,
+        'method': route.method.upper(),
+        'samples': len(samples),
+        **{f'{name}_ms': round(value, 3)
+           for name, value in percentiles(samples).items()},
+        'mean_ms': round(statistics.mean(
+            sample['seconds'] * 1000 for sample in samples), 3),
+        'queries_max': max(queries),
+        'queries_mean': statistics.mean(queries),
+        'query_budget': route.budget,
+        'bytes_mean': round(statistics.mean(
+            sample['bytes'] for sample in samples)),
+        'worst_queries': worst['queries'],
+    }
+
+
+def save(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, 'endpoints-{}.json'.format(
+        datetime.now().strftime('%Y%m%d-%H%M%S')))
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(results, output, ensure_ascii=False, indent=2)
+    return path
+
+
+class TestEndpointsBenchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_every_route(self):
+        call_command(
+            'generate_data', database=True, seed=0, users=USERS,
+            titles=TITLES, reviews_per_title=REVIEWS_PER_TITLE,
+            stdout=StringIO())
+        catalog = Catalog()
+        results = {
+            'started': datetime.now(timezone.utc).isoformat(
+                timespec='seconds'),
+            'database': connection.vendor,
+            'dataset': {'titles': TITLES, 'users': USERS,
+                        'reviews_per_title': REVIEWS_PER_TITLE},
+            'rounds': ROUNDS,
+            'routes': {},
+        }
+        over_budget = []
+        for route in routes(catalog):
+            summary = summarize(route, run(route))
+            results['routes'][route.label] = summary
+            print(
+                f'\n{route.label:<28} p50 {summary["p50_ms"]:7.2f} ms  '
+                f'p95 {summary["p95_ms"]:7.2f} ms  '
+                f'p99 {summary["p99_ms"]:7.2f} ms  '
+                f'{summary["queries_max"]:2} queries  '
+                f'{summary["bytes_mean"]:7} bytes', end='')
+            if summary['queries_max'] > route.budget:
+                over_budget.append(
+                    f'{route.label}: {summary["queries_max"]} queries, '
+                    f'budget {route.budget}')
+        print(f'\nResults saved to {save(results)}')
+
+        covered = {summary['route'] for summary in results['routes'].values()}
+        assert covered >= route_names(), (
+            f'Routes without a benchmark: {route_names() - covered}')
+        assert not over_budget, '\n'.join(over_budget)
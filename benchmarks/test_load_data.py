@@ -0,0 +1,65 @@
+import csv
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+ROWS = int(os.environ.get('BENCH_IMPORT_ROWS', 20000))
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    users = max(ROWS // 10, 1)
+    titles = max(ROWS // 10, 1)
+    write_csv(tmp_path / 'category.csv', ['id', 'name', 'slug'],
+              [(1, 'Фильм', 'movie')])
+    write_csv(tmp_path / 'genre.csv', ['id', 'name', 'slug'],
+              [(1, 'Драма', 'drama')])
+    write_csv(tmp_path / 'users.csv', ['id', 'username', 'email', 'role'],
+              ((n, f'user{n}', f'user{n}@yamdb.fake', 'user')
+               for n in range(1, users + 1)))
+    write_csv(tmp_path / 'titles.csv', ['id', 'name', 'year', 'category'],
+              ((n, f'Произведение {n}', 2000, 1)
+               for n in range(1, titles + 1)))
+    write_csv(tmp_path / 'genre_title.csv', ['id', 'title_id', 'genre_id'],
+              ((n, n, 1) for n in range(1, titles + 1)))
+    write_csv(tmp_path / 'review.csv',
+              ['id', 'title_id', 'text', 'author', 'score', 'pub_date'],
+              ((n, n % titles + 1, 'Текст отзыва ' * 20, n // titles + 1,
+                n % 10 + 1, '2020-01-01T00:00:00Z')
+               for n in range(1, ROWS + 1)))
+    write_csv(tmp_path / 'comments.csv',
+              ['id', 'review_id', 'text', 'author', 'pub_date'],
+              ((n, n, 'Комментарий', 1, '2020-01-01T00:00:00Z')
+               for n in range(1, ROWS + 1)))
+    return tmp_path
+
+
+def run(path, **options):
+    from reviews.importer import TABLES
+
+    for table in reversed(TABLES):
+        table.model.objects.all().delete()
+    started = time.perf_counter()
+    call_command('load_data', path=str(path), force=True, stdout=StringIO(),
+                 **options)
+    return time.perf_counter() - started
+
+
+class TestLoadDataBenchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_serial_vs_workers(self, catalog):
+        serial = run(catalog)
+        parallel = run(catalog, workers=3)
+        print(f'\nload_data {ROWS} reviews + {ROWS} comments: '
+              f'serial {serial:.2f} s, 3 workers {parallel:.2f} s')
@@ -0,0 +1,46 @@
+import pytest
+
+from tests.common import auth_client, create_comments
+
+from .common import measure, report
+
+ROUNDS = 20
+
+
+def user_lookups(sample):
+    return sum('FROM "reviews_user"' in sql for sql in sample['queries'])
+
+
+class TestModerationBenchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_moderator_edits_and_deletes(self, admin_client, admin):
+        from reviews.models import Comment
+
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin)
+        client_user = auth_client(user)
+        client_moderator = auth_client(moderator)
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        for number in range(ROUNDS):
+            client_user.post(url, data={'text': f'Комментарий {number}'})
+        own_ids = Comment.objects.filter(
+            author=user).values_list('id', flat=True)
+
+        patches = [
+            measure(client_moderator, 'patch', f'{url}{comment_id}/',
+                    data={'text': 'Отмодерировано'})
+            for comment_id in own_ids
+        ]
+        deletes = [
+            measure(client_moderator, 'delete', f'{url}{comment_id}/')
+            for comment_id in own_ids
+        ]
+        report('moderator PATCH comment', patches)
+        report('moderator DELETE comment', deletes)
+        for sample in patches + deletes:
+            assert sample['status'] in (200, 204)
+            # Only the authenticating lookup may touch the users table:
+            # the permission check compares author_id with request.user.id.
+            assert user_lookups(sample) <= 1
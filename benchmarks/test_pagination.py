@@ -0,0 +1,81 @@
+import os
+from base64 import b64encode
+from urllib import parse
+
+import pytest
+
+from .common import measure, report, token_client
+
+PAGE_SIZE = 10
+PAGES = int(os.environ.get('BENCH_PAGES', 1000))
+ROUNDS = 10
+
+
+def cursor_after(position):
+    querystring = parse.urlencode({'p': position})
+    return b64encode(querystring.encode('ascii')).decode('ascii')
+
+
+def compare(client, url, deep_cursor):
+    results = {
+        'page 1': [measure(client, 'get', url) for _ in range(ROUNDS)],
+        f'page {PAGES}': [
+            measure(client, 'get', url, data={'page': PAGES})
+            for _ in range(ROUNDS)
+        ],
+        'cursor page 1': [
+            measure(client, 'get', url, data={'pagination': 'cursor'})
+            for _ in range(ROUNDS)
+        ],
+        f'cursor page {PAGES}': [
+            measure(client, 'get', url, data={'cursor': deep_cursor})
+            for _ in range(ROUNDS)
+        ],
+    }
+    for mode, samples in results.items():
+        assert all(sample['status'] == 200 for sample in samples)
+        report(f'{url} {mode}', samples)
+
+
+class TestPaginationBenchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deep_pages(self, admin):
+        from reviews.models import Comment, Review, Title, User
+
+        rows = PAGES * PAGE_SIZE
+        title = Title.objects.create(name='Бенчмарк', year=2000)
+        User.objects.bulk_create(
+            User(username=f'bench{number}', email=f'bench{number}@yamdb.fake')
+            for number in range(rows)
+        )
+        authors = list(User.objects.filter(
+            username__startswith='bench').values_list('id', flat=True))
+        Review.objects.bulk_create(
+            (Review(title=title, author_id=author, text='Текст', score=5)
+             for author in authors),
+            batch_size=500,
+        )
+        # Anonymous responses are cached, a signed in reader's are not.
+        client = token_client(User.objects.get(username='bench0'))
+        review_ids = sorted(
+            Review.objects.filter(title=title).values_list('id', flat=True))
+        compare(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/',
+            cursor_after(review_ids[(PAGES - 1) * PAGE_SIZE - 1]),
+        )
+
+        review = Review.objects.get(pk=review_ids[0])
+        Comment.objects.bulk_create(
+            (Comment(review=review, author=admin, text='Текст')
+             for _ in range(rows)),
+            batch_size=500,
+        )
+        dates = list(review.comments.order_by('-pub_date').values_list(
+            'pub_date', flat=True))
+        compare(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            cursor_after(dates[(PAGES - 1) * PAGE_SIZE - 1].isoformat()),
+        )
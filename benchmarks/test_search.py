@@ -0,0 +1,49 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from .common import measure, report, token_client
+
+TITLES = int(os.environ.get('BENCH_SEARCH_TITLES', 1000000))
+ROUNDS = 10
+# From one title to none: contains has to scan the whole table to fill
+# a page, the index only reads the matching entries.
+QUERIES = ('123456', '4242', 'ведение 99999', 'нет такого')
+
+
+def run(client, params):
+    samples = []
+    for _ in range(ROUNDS):
+        # The page count is cached per query, clearing the cache keeps
+        # the COUNT(*) in every request as on a first search.
+        cache.clear()
+        samples.append(measure(client, 'get', '/api/v1/titles/', data=params))
+    assert all(sample['status'] == 200 for sample in samples)
+    return samples
+
+
+class TestSearchBenchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_against_contains(self):
+        from reviews.models import User
+
+        call_command(
+            'generate_data', database=True, users=1, titles=TITLES,
+            genres=1, categories=1, reviews_per_title=0,
+            comments_per_review=0, stdout=StringIO())
+        # Anonymous responses are cached, a signed in reader's are not.
+        client = token_client(User.objects.get())
+        for query in QUERIES:
+            expected = client.get(
+                '/api/v1/titles/', {'name': query}).json()['count']
+            found = client.get(
+                '/api/v1/titles/', {'search': query}).json()['count']
+            # Words are looked up apart, contains takes the query whole.
+            assert found >= expected, query
+            report(f'name={query!r} ({expected} titles)',
+                   run(client, {'name': query}))
+            report(f'search={query!r}', run(client, {'search': query}))
@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from .common import percentiles
+
+SIGNUPS = int(os.environ.get('BENCH_SIGNUPS', 1000))
+# Every tenth signup repeats an earlier one, as users asking for a
+# new code do.
+USERS = SIGNUPS - SIGNUPS // 10
+
+
+class TestSignupLoadBenchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_signups(self):
+        from reviews.models import OutboxEmail, User
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal'
+
+        start = threading.Barrier(SIGNUPS)
+
+        def signup(number):
+            client = APIClient()
+            start.wait()
+            try:
+                started = time.perf_counter()
+                response = client.post('/api/v1/auth/signup/', {
+                    'username': f'load{number % USERS}',
+                    'email': f'load{number % USERS}@yamdb.fake',
+                })
+                return {
+                    'status': response.status_code,
+                    'seconds': time.perf_counter() - started,
+                }
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=SIGNUPS) as executor:
+            samples = list(executor.map(signup, range(SIGNUPS)))
+        elapsed = time.perf_counter() - started
+
+        timings = percentiles(samples)
+        print(
+            f'\n{SIGNUPS} concurrent signups in {elapsed:.2f} s, '
+            f'{SIGNUPS / elapsed:.0f}/s, '
+            + ', '.join(f'{name} {value:.1f} ms'
+                        for name, value in timings.items())
+        )
+        statuses = [sample['status'] for sample in samples]
+        assert statuses.count(200) == SIGNUPS, {
+            status: statuses.count(status) for status in set(statuses)}
+        assert User.objects.filter(username__startswith='load').count() == (
+            USERS)
+        assert OutboxEmail.objects.count() == SIGNUPS
+
+        client = APIClient()
+        for email in OutboxEmail.objects.all()[:10]:
+            response = client.post('/api/v1/auth/token/', {
+                'username': email.subject,
+                'confirmation_code': email.body,
+            })
+            assert response.status_code == 200
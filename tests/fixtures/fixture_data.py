@@ -0,0 +1,14 @@
+import os
+import shutil
+
+import pytest
+
+from ..conftest import MANAGE_PATH
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    source = os.path.join(MANAGE_PATH, 'static', 'data')
+    for filename in os.listdir(source):
+        shutil.copy(os.path.join(source, filename), tmp_path)
+    return tmp_path
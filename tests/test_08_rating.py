@@ -0,0 +1,89 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/` возвращается статус 200'
+        )
+        return response.json().get('rating')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        client_user = auth_client(user)
+        client_moderator = auth_client(moderator)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 4, (
+            'Проверьте, что `rating` произведения равен среднему значению оценок отзывов'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None, (
+            'Проверьте, что `rating` произведения без отзывов равен `None`'
+        )
+
+        response = client_user.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/', data={'score': 9}
+        )
+        assert response.status_code == 200
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что `rating` произведения пересчитывается при изменении отзыва'
+        )
+
+        for client, review in zip((admin_client, client_user, client_moderator), reviews):
+            response = client.delete(f'/api/v1/titles/{title_id}/reviews/{review["id"]}/')
+            assert response.status_code == 204
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что `rating` произведения сбрасывается при удалении всех отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recalc_ratings_command(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('recalc_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4.0), (
+            'Проверьте, что команда `recalc_ratings` пересчитывает рейтинг произведений'
+        )
+        assert self.get_rating(admin_client, titles[0]['id']) == 4
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_follows_reviews_outside_api(self, client, admin_client, admin):
+        from reviews.models import Review
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.score = 2
+        review.save()
+        assert self.get_rating(admin_client, title_id) == 3, (
+            'Проверьте, что `rating` пересчитывается при изменении отзыва вне API, '
+            'например в админке'
+        )
+        first, second = Review.objects.get(pk=review.pk), Review.objects.get(pk=review.pk)
+        first.score = 10
+        first.save()
+        second.score = 2
+        second.save()
+        assert self.get_rating(admin_client, title_id) == 3, (
+            'Проверьте, что `rating` верен после одновременных изменений одного отзыва'
+        )
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert self.get_rating(admin_client, title_id) == 3, (
+            'Проверьте, что `rating` пересчитывается при удалении отзывов вместе с автором'
+        )
+        Review.objects.filter(author=moderator).delete()
+        assert self.get_rating(admin_client, title_id) == 2
+        admin.delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что `rating` сбрасывается, когда все отзывы удалены каскадно'
+        )
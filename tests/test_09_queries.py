@@ -0,0 +1,180 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments, create_titles, create_users_api
+
+
+@pytest.fixture
+def reader_client(django_user_model):
+    from rest_framework.test import APIClient
+
+    from api.tokens import RoleRefreshToken
+
+    reader = django_user_model.objects.create_user(
+        username='TestReader', email='testreader@yamdb.fake', password='1234567'
+    )
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleRefreshToken.for_user(reader).access_token}')
+    return client
+
+
+def count_queries(client, url):
+    # Читатель с токеном не получает ответы из кэша анонимных запросов,
+    # а первый запрос прогревает кэш количества объектов для пагинации.
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    return len(context.captured_queries)
+
+
+class Test09QueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_queries_do_not_grow(self, reader_client, admin_client):
+        client = reader_client
+        titles, categories, genres = create_titles(admin_client)
+        first_list = count_queries(client, '/api/v1/titles/')
+        first_detail = count_queries(client, f'/api/v1/titles/{titles[0]["id"]}/')
+        for number in range(8):
+            data = {'name': f'Произведение {number}', 'year': 2000,
+                    'genre': [genre['slug'] for genre in genres],
+                    'category': categories[number % 2]['slug']}
+            response = admin_client.post('/api/v1/titles/', data=data)
+            assert response.status_code == 201
+        assert count_queries(client, '/api/v1/titles/') == first_list, (
+            'Проверьте, что количество запросов к БД при GET запросе `/api/v1/titles/` '
+            'не зависит от количества произведений на странице'
+        )
+        assert first_list <= 3, (
+            'Проверьте, что при GET запросе `/api/v1/titles/` жанры и категории '
+            'загружаются через `select_related` и `prefetch_related`'
+        )
+        assert count_queries(client, f'/api/v1/titles/{titles[0]["id"]}/') == first_detail <= 2, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/` жанры и категории '
+            'загружаются через `select_related` и `prefetch_related`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_are_compact(self, reader_client, admin_client, admin):
+        client = reader_client
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        first_list = count_queries(client, url)
+        for number in range(5):
+            response = admin_client.post(url, data={'text': f'Комментарий {number}'})
+            assert response.status_code == 201
+        assert count_queries(client, url) == first_list <= 3, (
+            f'Проверьте, что количество запросов к БД при GET запросе `{url}` '
+            'не зависит от количества комментариев на странице'
+        )
+
+        comment = client.get(url).json()['results'][0]
+        assert comment['review'] == reviews[0]['id'], (
+            f'Проверьте, что при GET запросе `{url}` поле `review` содержит id отзыва'
+        )
+        comment = client.get(url, {'expand': 'review'}).json()['results'][0]
+        assert comment['review']['id'] == reviews[0]['id'], (
+            f'Проверьте, что при GET запросе `{url}?expand=review` поле `review` '
+            'содержит данные отзыва'
+        )
+        assert comment['review']['text'] == reviews[0]['text']
+        assert count_queries(client, url + '?expand=review') == first_list
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что комментарии к отзыву доступны только по адресу произведения этого отзыва'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_post_queries(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        user, _ = create_users_api(admin_client)
+        client_user = auth_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client_user.post(url, data={'text': 'Текст', 'score': 7})
+        assert response.status_code == 201
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert sum('"reviews_title"' in sql for sql in selects) == 1, (
+            f'Проверьте, что при POST запросе `{url}` произведение загружается из БД один раз'
+        )
+        assert not any('"reviews_review"' in sql for sql in selects), (
+            f'Проверьте, что при POST запросе `{url}` повторный отзыв отсекается '
+            'ограничением уникальности, а не отдельным запросом'
+        )
+
+        response = client_user.post(url, data={'text': 'Ещё текст', 'score': 3})
+        assert response.status_code == 400, (
+            f'Проверьте, что при POST запросе `{url}` нельзя оставить второй отзыв '
+            'на то же произведение'
+        )
+        response = client_user.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что отклонённый повторный отзыв не меняет рейтинг произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_stateless_token_reads(self, admin_client, user):
+        from rest_framework.test import APIClient
+
+        from api.tokens import RoleRefreshToken
+
+        titles, _, _ = create_titles(admin_client)
+        token = RoleRefreshToken.for_user(user).access_token
+        assert token['role'] == user.role and token['username'] == user.username, (
+            'Проверьте, что токен содержит `username` и `role` пользователя'
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert not any('"reviews_user"' in query['sql'] for query in context.captured_queries), (
+            f'Проверьте, что при GET запросе `{url}` пользователь строится из токена без запроса к БД'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/')
+        assert response.status_code == 403
+        assert not context.captured_queries, (
+            'Проверьте, что проверка прав администратора для пользователя с ролью `user` '
+            'не обращается к БД'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(f'{url}reviews/', data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201
+        assert any('"reviews_user"' in query['sql'] for query in context.captured_queries), (
+            'Проверьте, что при изменяющих запросах пользователь загружается из БД'
+        )
+        review_url = f'{url}reviews/{response.json()["id"]}/'
+
+        response = client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        assert response.status_code == 200
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200 and response.json()['username'] == 'renamed', (
+            'Проверьте, что `/api/v1/users/me/` находит пользователя, сменившего `username`, '
+            'по старому токену'
+        )
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что `/api/v1/users/me/` не доступен деактивированному пользователю'
+        )
+
+        user.delete()
+        response = client.patch(review_url, data={'score': 1})
+        assert response.status_code == 401, (
+            'Проверьте, что токен удалённого пользователя не позволяет изменять данные'
+        )
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что `/api/v1/users/me/` не доступен удалённому пользователю'
+        )
@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_genre
+
+
+class Test10Pagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cursor_pagination_is_opt_in(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        for number in range(12):
+            admin_client.post(url, data={'text': f'Комментарий {number}'})
+
+        data = client.get(url).json()
+        assert data['count'] == 15, (
+            f'Проверьте, что при GET запросе `{url}` без параметров сохраняется пагинация по страницам'
+        )
+
+        data = client.get(url, {'pagination': 'cursor'}).json()
+        assert 'count' not in data and data['next'] and len(data['results']) == 10, (
+            f'Проверьте, что при GET запросе `{url}?pagination=cursor` используется пагинация по курсору'
+        )
+        seen = [item['id'] for item in data['results']]
+        data = client.get(data['next']).json()
+        seen += [item['id'] for item in data['results']]
+        assert data['next'] is None and data['previous'], (
+            'Проверьте, что ссылка `next` ведёт на следующую страницу курсора'
+        )
+        assert len(set(seen)) == 15, (
+            'Проверьте, что при пагинации по курсору комментарии не повторяются и не теряются'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = client.get(url, {'pagination': 'cursor'}).json()
+        assert [item['id'] for item in data['results']] == sorted(review['id'] for review in reviews), (
+            f'Проверьте, что при GET запросе `{url}?pagination=cursor` отзывы упорядочены по `id`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_count_is_cached_until_write(self, client, admin_client):
+        genres = create_genre(admin_client)
+        url = '/api/v1/genres/'
+        assert client.get(url).json()['count'] == 3
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(url).json()
+        assert data['count'] == 3
+        assert not any('COUNT(' in query['sql'] for query in context.captured_queries), (
+            f'Проверьте, что при повторном GET запросе `{url}` количество объектов берётся из кэша'
+        )
+        assert client.get(url, {'search': 'Ужасы'}).json()['count'] == 1, (
+            'Проверьте, что количество объектов кэшируется отдельно для каждого набора фильтров'
+        )
+
+        admin_client.delete(f'{url}{genres[0]["slug"]}/')
+        assert client.get(url).json()['count'] == 2, (
+            'Проверьте, что кэш количества объектов сбрасывается при изменении модели'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_estimated_count(self, client, admin_client, monkeypatch):
+        import api.pagination
+
+        genres = create_genre(admin_client)
+        admin_client.delete(f'/api/v1/genres/{genres[1]["slug"]}/')
+        monkeypatch.setattr(api.pagination, 'COUNT_ESTIMATE_THRESHOLD', 1)
+        with CaptureQueriesContext(connection) as context:
+            data = client.get('/api/v1/genres/').json()
+        # Only PostgreSQL keeps a row estimate; SQLite counts exactly.
+        assert data['count'] == 2 and len(data['results']) == 2, (
+            'Проверьте, что без оценки от базы данных количество объектов считается точно'
+        )
+        assert not any('MAX(' in query['sql'] for query in context.captured_queries), (
+            'Проверьте, что количество не оценивается по наибольшему первичному ключу'
+        )
+        assert client.get('/api/v1/genres/', {'search': 'Драма'}).json()['count'] == 1, (
+            'Проверьте, что с фильтрами количество объектов считается точно'
+        )
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test11ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_anonymous_reads_are_cached(self, client, admin_client, admin):
+        from api.cache import response_cache_stats
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        before = response_cache_stats.snapshot()
+
+        assert client.get(url)['X-Cache'] == 'MISS'
+        assert client.get(other_url)['X-Cache'] == 'MISS'
+        response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET запрос `{url}` без токена отдаётся из кэша'
+        )
+        assert response.json()['count'] == 3
+        assert client.get(url, {'page': 1})['X-Cache'] == 'MISS', (
+            'Проверьте, что ключ кэша учитывает параметры запроса'
+        )
+        assert 'X-Cache' not in admin_client.get(url), (
+            'Проверьте, что ответы для авторизованных пользователей не кэшируются'
+        )
+        after = response_cache_stats.snapshot()
+        assert after['hit'] - before['hit'] == 1 and after['miss'] - before['miss'] == 3, (
+            'Проверьте, что счётчики попаданий и промахов кэша обновляются'
+        )
+
+        response = auth_client(user).delete(f'{url}{reviews[1]["id"]}/')
+        assert response.status_code == 204
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS' and response.json()['count'] == 2, (
+            'Проверьте, что кэш отзывов сбрасывается при удалении отзыва'
+        )
+        assert client.get(other_url)['X-Cache'] == 'HIT', (
+            'Проверьте, что удаление отзыва не сбрасывает кэш отзывов других произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_follow_related_changes(self, client, admin_client):
+        from .common import create_titles
+
+        titles, _, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+        client.get('/api/v1/titles/')
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+        admin_client.patch(url, data={'genre': [genres[2]['slug']]})
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что кэш произведения сбрасывается при изменении его жанров'
+        )
+        assert [genre['slug'] for genre in response.json()['genre']] == [genres[2]['slug']]
+
+        admin_client.delete(f'/api/v1/genres/{genres[2]["slug"]}/')
+        assert client.get(url).json()['genre'] == [], (
+            'Проверьте, что кэш произведения сбрасывается при удалении жанра'
+        )
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalidation_reaches_other_processes(self, client):
+        from .conftest import MANAGE_PATH
+
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'HIT'
+        # Another worker or a management command writing to the data.
+        subprocess.run(
+            [sys.executable, '-c', 'import django; django.setup(); '
+             'from api.cache import bump_versions; bump_versions("titles")'],
+            cwd=MANAGE_PATH, check=True,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE='api_yamdb.settings', PYTHONPATH=MANAGE_PATH),
+        )
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS', (
+            'Проверьте, что кэш общий для процессов: сброс версии в другом процессе '
+            'должен сбрасывать закэшированные ответы'
+        )
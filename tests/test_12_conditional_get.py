@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_reviews
+
+
+class Test12ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_not_modified(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/',
+        )
+        for url in urls:
+            response = admin_client.get(url)
+            assert response.status_code == 200
+            etag = response['ETag']
+            last_modified = response['Last-Modified']
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f'Проверьте, что GET запрос `{url}` с актуальным `If-None-Match` возвращает статус 304'
+            )
+            assert not context.captured_queries, (
+                f'Проверьте, что ответ 304 на GET запрос `{url}` не обращается к БД'
+            )
+            response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            assert response.status_code == 304, (
+                f'Проверьте, что GET запрос `{url}` с актуальным `If-Modified-Since` возвращает статус 304'
+            )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        other_etag = client.get(f'/api/v1/titles/{titles[1]["id"]}/')['ETag']
+        admin_client.delete(f'{url}reviews/{reviews[0]["id"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что `ETag` произведения меняется при изменении его отзывов'
+        )
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/', HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == 304, (
+            'Проверьте, что `ETag` произведения не меняется при изменении отзывов другого произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_author_rename(self, client, admin_client, admin):
+        _, reviews, titles, user, _ = create_comments(admin_client, admin)
+        urls = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/',
+        )
+        etags = [client.get(url)['ETag'] for url in urls]
+        response = admin_client.patch(f'/api/v1/users/{user.username}/', data={'username': 'renamed'})
+        assert response.status_code == 200
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что после смены `username` автора GET запрос `{url}` '
+                'со старым `If-None-Match` не возвращает 304'
+            )
+            authors = [item['author'] for item in response.json()['results']]
+            assert 'renamed' in authors and user.username not in authors, (
+                f'Проверьте, что `{url}` показывает новое имя автора, а не ответ из кэша'
+            )
@@ -0,0 +1,111 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class Test13LoadData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_data(self, data_dir):
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('load_data', path=str(data_dir), batch_size=7, stdout=StringIO())
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert Title.genre.through.objects.count() == 42, (
+            'Проверьте, что команда `load_data` загружает жанры произведений из `genre_title.csv`'
+        )
+        review = Review.objects.get(pk=1)
+        assert (review.author.username, review.pub_date.year) == ('bingobongo', 2019), (
+            'Проверьте, что команда `load_data` сохраняет автора и дату публикации отзыва'
+        )
+        title = Title.objects.get(pk=1)
+        assert (title.category.slug, title.rating_count, title.rating) == ('movie', 2, 10), (
+            'Проверьте, что после загрузки рейтинг произведений пересчитан'
+        )
+        assert User.objects.get(username='capt_obvious').is_superuser
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_load_data_workers(self, data_dir):
+        from reviews.models import Review, Title
+
+        out = StringIO()
+        call_command('load_data', path=str(data_dir), batch_size=10, workers=2, stdout=out)
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Title.objects.get(pk=1).rating == 10, (
+            'Проверьте, что `load_data --workers` загружает те же данные, что и последовательный режим'
+        )
+        assert '2 workers' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_load_data_is_idempotent(self, data_dir):
+        from reviews.models import Review
+
+        call_command('load_data', path=str(data_dir), stdout=StringIO())
+        out = StringIO()
+        call_command('load_data', path=str(data_dir), stdout=out)
+        assert 'review.csv: unchanged, skipped' in out.getvalue(), (
+            'Проверьте, что `load_data` пропускает файлы, которые не изменились'
+        )
+        assert Review.objects.count() == 72
+
+        reviews = data_dir / 'review.csv'
+        content = reviews.read_text(encoding='utf-8').replace(',100,10,', ',100,1,', 1)
+        content = content.rstrip('\n') + '\n1000,2,"Новый отзыв",100,5,2021-01-01T00:00:00.000Z\n'
+        reviews.write_text(content, encoding='utf-8')
+        call_command('load_data', path=str(data_dir), upsert=True, stdout=StringIO())
+        assert Review.objects.count() == 73, (
+            'Проверьте, что `load_data --upsert` добавляет новые строки изменившегося файла'
+        )
+        assert Review.objects.get(pk=1).score == 1, (
+            'Проверьте, что `load_data --upsert` обновляет существующие строки по `id`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_load_data_resumes(self, data_dir, monkeypatch):
+        import reviews.importer
+        from reviews.models import ImportCheckpoint, Review
+
+        write_batch = reviews.importer.write_batch
+        calls = []
+
+        def interrupted(model, *args, **kwargs):
+            if model is Review and len(calls) == 3:
+                raise KeyboardInterrupt
+            if model is Review:
+                calls.append(model)
+            write_batch(model, *args, **kwargs)
+
+        monkeypatch.setattr(reviews.importer, 'write_batch', interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            call_command('load_data', path=str(data_dir), batch_size=10, stdout=StringIO())
+        assert Review.objects.count() == 30
+        checkpoint = ImportCheckpoint.objects.get(filename='review.csv')
+        assert (checkpoint.rows, checkpoint.completed) == (30, False)
+
+        monkeypatch.setattr(reviews.importer, 'write_batch', write_batch)
+        out = StringIO()
+        call_command('load_data', path=str(data_dir), batch_size=10, stdout=out)
+        assert 'review.csv: resuming after 30 rows' in out.getvalue(), (
+            'Проверьте, что `load_data` продолжает прерванную загрузку с контрольной точки'
+        )
+        assert Review.objects.count() == 72
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_load_data_workers_write_error(self, data_dir, tmp_path):
+        from django.db import IntegrityError
+        from reviews.models import Review
+
+        call_command('load_data', path=str(data_dir), stdout=StringIO())
+        reviews = tmp_path / 'reviews'
+        reviews.mkdir()
+        (reviews / 'review.csv').write_bytes((data_dir / 'review.csv').read_bytes())
+        # The first batch conflicts with the loaded rows while the worker
+        # still has the rest of the file to queue.
+        with pytest.raises(IntegrityError):
+            call_command('load_data', path=str(reviews), force=True, workers=2,
+                         batch_size=1, stdout=StringIO())
+        assert Review.objects.count() == 72
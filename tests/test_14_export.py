@@ -0,0 +1,61 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class Test14Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_dump_data_round_trip(self, data_dir, tmp_path_factory):
+        from reviews.models import Comment, Review, Title
+
+        call_command('load_data', path=str(data_dir), stdout=StringIO())
+        review = Review.objects.get(pk=1)
+        title = Title.objects.get(pk=1)
+        dump_dir = tmp_path_factory.mktemp('dump')
+        call_command('dump_data', path=str(dump_dir), chunk_size=10, stdout=StringIO())
+        assert (dump_dir / 'review.csv').read_text(encoding='utf-8').startswith(
+            'id,title_id,text,author,score,pub_date'
+        ), 'Проверьте, что `dump_data` пишет CSV в формате, который читает `load_data`'
+
+        Comment.objects.all().delete()
+        Review.objects.all().delete()
+        Title.objects.all().delete()
+        call_command('load_data', path=str(dump_dir), upsert=True, stdout=StringIO())
+        assert (Title.objects.count(), Review.objects.count(), Comment.objects.count()) == (32, 72, 3), (
+            'Проверьте, что данные, выгруженные `dump_data`, загружаются командой `load_data`'
+        )
+        assert Review.objects.get(pk=1).pub_date == review.pub_date
+        assert Review.objects.get(pk=1).text == review.text
+        assert list(Title.objects.get(pk=1).genre.all()) == list(title.genre.all())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_endpoint(self, data_dir, admin_client, user_client):
+        call_command('load_data', path=str(data_dir), stdout=StringIO())
+        url = '/api/v1/export/titles/'
+        response = user_client.get(url)
+        assert response.status_code == 403, (
+            f'Проверьте, что GET запрос `{url}` доступен только администратору'
+        )
+        assert admin_client.get('/api/v1/export/unknown/').status_code == 404
+        assert admin_client.get(url, {'fmt': 'xml'}).status_code == 400
+
+        response = admin_client.get(url, {'fmt': 'ndjson'})
+        assert response.status_code == 200
+        assert response.streaming, (
+            f'Проверьте, что GET запрос `{url}` отдаёт данные потоком'
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        titles = [json.loads(line) for line in lines]
+        assert len(titles) == 32
+        assert titles[0]['id'] == 1 and titles[0]['category'] == 1, (
+            f'Проверьте, что GET запрос `{url}?fmt=ndjson` отдаёт по одному произведению на строку'
+        )
+        assert 'rating' in titles[0]
+
+        response = admin_client.get('/api/v1/export/review/')
+        assert response['Content-Type'].startswith('text/csv')
+        content = b''.join(response.streaming_content).decode()
+        assert content.splitlines()[0] == 'id,title_id,text,author,score,pub_date'
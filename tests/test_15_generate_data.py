@@ -0,0 +1,68 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+OPTIONS = {
+    'users': 50, 'titles': 40, 'genres': 5, 'categories': 3,
+    'reviews_per_title': 6, 'comments_per_review': 0.5,
+}
+
+
+class Test15GenerateData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_generate_csv(self, tmp_path_factory):
+        from reviews.models import Review, Title
+
+        first = tmp_path_factory.mktemp('first')
+        second = tmp_path_factory.mktemp('second')
+        other = tmp_path_factory.mktemp('other')
+        call_command('generate_data', path=str(first), seed=1, stdout=StringIO(), **OPTIONS)
+        call_command('generate_data', path=str(second), seed=1, stdout=StringIO(), **OPTIONS)
+        call_command('generate_data', path=str(other), seed=2, stdout=StringIO(), **OPTIONS)
+        review_csv = (first / 'review.csv').read_text(encoding='utf-8')
+        assert review_csv == (second / 'review.csv').read_text(encoding='utf-8'), (
+            'Проверьте, что `generate_data` с одним и тем же `--seed` создаёт одинаковые данные'
+        )
+        assert review_csv != (other / 'review.csv').read_text(encoding='utf-8')
+
+        call_command('load_data', path=str(first), stdout=StringIO())
+        assert Title.objects.count() == 40
+        assert Review.objects.count() == len(review_csv.splitlines()) - 1, (
+            'Проверьте, что CSV файлы `generate_data` загружаются командой `load_data`'
+        )
+        counts = sorted(Title.objects.values_list('rating_count', flat=True))
+        assert counts[-1] > 3 * counts[len(counts) // 2], (
+            'Проверьте, что число отзывов на произведение распределено по закону Ципфа'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_generate_into_database(self, tmp_path):
+        from reviews.models import Comment, Review, Title
+
+        call_command('generate_data', path=str(tmp_path), seed=3, stdout=StringIO(), **OPTIONS)
+        call_command('generate_data', database=True, seed=3, batch_size=7, stdout=StringIO(), **OPTIONS)
+        assert Review.objects.count() == len(
+            (tmp_path / 'review.csv').read_text(encoding='utf-8').splitlines()) - 1
+        assert Comment.objects.count() == len(
+            (tmp_path / 'comments.csv').read_text(encoding='utf-8').splitlines()) - 1
+        title = Title.objects.exclude(rating=None).first()
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.rating == sum(scores) / len(scores), (
+            'Проверьте, что `generate_data --database` пересчитывает рейтинг произведений'
+        )
+
+    def test_03_review_counts_keep_mean(self):
+        from reviews.generator import Generator
+
+        for zipf in (0, 1.0, 2.5):
+            counts = Generator(users=50, titles=40, reviews_per_title=6, zipf=zipf).review_counts
+            assert max(counts) <= 50, (
+                'Проверьте, что у произведения не больше отзывов, чем пользователей'
+            )
+            assert sum(counts) == 40 * 6, (
+                'Проверьте, что отзывы сверх числа пользователей достаются другим '
+                'произведениям и среднее равно `--reviews-per-title`'
+            )
+        assert sum(Generator(users=5, titles=3, reviews_per_title=10).review_counts) == 15
@@ -0,0 +1,63 @@
+import os
+import pstats
+
+import pytest
+
+from .common import create_titles
+
+
+def timings(response):
+    header = response.get('Server-Timing')
+    if header is None:
+        return None
+    return {
+        metric.split(';')[0].strip(): metric
+        for metric in header.split(', ')
+    }
+
+
+class Test16Profiling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_admin_profile_header(self, admin_client, user_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        assert timings(admin_client.get(url)) is None, (
+            'Проверьте, что без заголовка `X-Profile` запрос не профилируется'
+        )
+        assert timings(user_client.get(url, HTTP_X_PROFILE='1')) is None, (
+            'Проверьте, что результаты профилирования видны только администратору'
+        )
+        metrics = timings(admin_client.get(url, HTTP_X_PROFILE='1'))
+        assert metrics is not None, (
+            'Проверьте, что при запросе администратора с заголовком `X-Profile` '
+            'в ответе есть заголовок `Server-Timing`'
+        )
+        assert {'db', 'serializer', 'render', 'total'} <= set(metrics)
+        assert 'queries' in metrics['db']
+        assert 'sql-1' in metrics and 'SELECT' in metrics['sql-1'], (
+            'Проверьте, что в `Server-Timing` есть самые медленные SQL запросы'
+        )
+        serializer = float(metrics['serializer'].split('dur=')[1])
+        assert serializer > 0, (
+            'Проверьте, что время работы сериализатора попадает в профиль запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_profiling_enabled_and_cprofile(self, client, admin_client, monkeypatch, tmp_path):
+        import api.profiling
+
+        monkeypatch.setattr(api.profiling, 'PROFILING_ENABLED', True)
+        metrics = timings(client.get('/api/v1/genres/'))
+        assert metrics is not None and 'sql-1' not in metrics, (
+            'Проверьте, что с `PROFILING_ENABLED` профилируется каждый запрос, '
+            'а тексты SQL запросов показываются только по заголовку `X-Profile`'
+        )
+
+        monkeypatch.setattr(api.profiling, 'PROFILING_DIR', str(tmp_path))
+        response = admin_client.get('/api/v1/genres/', HTTP_X_PROFILE='cprofile')
+        assert response.status_code == 200
+        path = os.path.join(tmp_path, response['X-Profile-File'])
+        assert pstats.Stats(path).total_calls > 0, (
+            'Проверьте, что с заголовком `X-Profile: cprofile` сохраняется файл cProfile'
+        )
@@ -0,0 +1,130 @@
+import json
+import threading
+
+import pytest
+
+from .common import create_titles
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200, (
+        'Проверьте, что GET запрос `/metrics` возвращает статус 200'
+    )
+    assert response['Content-Type'].startswith('text/plain')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+class Test17Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_metrics_endpoint(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        before = scrape(client)
+        requests = 'http_requests_total{view="TitleViewSet",method="GET",status="200"}'
+        for _ in range(3):
+            admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        after = scrape(client)
+        assert after[requests] - before.get(requests, 0) == 3, (
+            'Проверьте, что `/metrics` считает запросы к каждому представлению'
+        )
+        latency = 'http_request_duration_seconds_count{view="TitleViewSet"}'
+        assert after[latency] - before.get(latency, 0) == 3
+        assert 'http_request_duration_seconds_bucket{view="TitleViewSet",le="+Inf"}' in after
+        assert 'db_queries_per_request_sum{view="TitleViewSet"}' in after, (
+            'Проверьте, что `/metrics` содержит гистограмму числа SQL запросов'
+        )
+        assert 'db_query_duration_seconds_count{view="TitleViewSet"}' in after
+        hits = 'response_cache_requests_total{result="hit"}'
+        assert after[hits] - before.get(hits, 0) == 1
+        assert 0 < after['response_cache_hit_ratio'] <= 1, (
+            'Проверьте, что `/metrics` содержит долю попаданий в кэш ответов'
+        )
+        assert 'email_queue_depth' in after
+
+        response = client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == 403, (
+            'Проверьте, что `/metrics` доступен только с разрешённых адресов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_threads_and_processes(self, client, monkeypatch, tmp_path):
+        import api.metrics
+        from api.metrics import REGISTRY, Counter
+
+        counter = Counter('test_events_total', 'Test events.', ('kind',))
+
+        def record():
+            for _ in range(1000):
+                counter.inc(kind='thread')
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert REGISTRY.local_samples()[counter.key({'kind': 'thread'})] == 4000, (
+            'Проверьте, что значения метрик из разных потоков складываются без потерь'
+        )
+
+        monkeypatch.setattr(api.metrics, 'METRICS_MULTIPROCESS_DIR', str(tmp_path))
+        monkeypatch.setattr(api.metrics, 'process_file', None)
+        other_process = [['test_events_total', [['kind', 'thread']], 500]]
+        (tmp_path / 'metrics-1-1.json').write_text(json.dumps(other_process))
+        samples = scrape(client)
+        assert samples['test_events_total{kind="thread"}'] == 4500, (
+            'Проверьте, что в многопроцессном режиме метрики процессов складываются'
+        )
+        assert len(list(tmp_path.glob('metrics-*.json'))) == 2
+        del REGISTRY.metrics['test_events_total']
+
+    def test_03_dead_threads_shards(self):
+        from api.metrics import REGISTRY, Counter
+
+        counter = Counter('test_threads_total', 'Test events.')
+        before = len(REGISTRY.shards)
+        for _ in range(20):
+            thread = threading.Thread(target=counter.inc)
+            thread.start()
+            thread.join()
+        counter.inc()
+        assert len(REGISTRY.shards) <= before + 1, (
+            'Проверьте, что данные завершившихся потоков не копятся в отдельных шардах'
+        )
+        assert REGISTRY.local_samples()[counter.key({})] == 21, (
+            'Проверьте, что значения завершившихся потоков не теряются'
+        )
+        del REGISTRY.metrics['test_threads_total']
+
+    def test_04_dead_processes_files(self, tmp_path):
+        from api.metrics import clear_directory, mark_process_dead, read_directory
+
+        key = ('test_events_total', (('kind', 'process'),))
+        for pid, value in ((1, 5), (2, 7)):
+            stored = [['test_events_total', [['kind', 'process']], value]]
+            (tmp_path / f'metrics-{pid}-1.json').write_text(json.dumps(stored))
+        (tmp_path / 'metrics-1-1.json.tmp').write_text('[')
+
+        mark_process_dead(1, str(tmp_path))
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            'archive.json', 'metrics-2-1.json'
+        ], (
+            'Проверьте, что файлы завершившегося процесса удаляются'
+        )
+        assert read_directory(str(tmp_path))[key] == 12, (
+            'Проверьте, что значения завершившегося процесса сохраняются'
+        )
+        mark_process_dead(2, str(tmp_path))
+        assert read_directory(str(tmp_path))[key] == 12
+
+        clear_directory(str(tmp_path))
+        assert list(tmp_path.iterdir()) == [], (
+            'Проверьте, что каталог метрик очищается при старте сервера'
+        )
@@ -0,0 +1,50 @@
+import pytest
+
+from .common import create_titles
+
+
+@pytest.fixture
+def slow_query_log(monkeypatch, tmp_path):
+    import api.slow_queries
+
+    log_file = tmp_path / 'slow_queries.log'
+    api.slow_queries.stop_listener()
+    monkeypatch.setattr(api.slow_queries, 'SLOW_QUERY_LOG_FILE', str(log_file))
+    monkeypatch.setattr(api.slow_queries, 'SLOW_QUERY_THRESHOLD_MS', 0)
+    api.slow_queries.start_listener()
+    yield log_file
+    api.slow_queries.stop_listener()
+    monkeypatch.undo()
+    api.slow_queries.start_listener()
+
+
+class Test18SlowQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_slow_queries_are_logged_with_plan(self, client, admin_client, slow_query_log):
+        import api.slow_queries
+
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/', {'name': 'Поворот'})
+        assert response.status_code == 200
+        api.slow_queries.stop_listener()
+
+        log = slow_query_log.read_text(encoding='utf-8')
+        entry = next(
+            (entry for entry in log.split('\n20')
+             if 'GET /api/v1/titles/?name=' in entry and 'LIKE' in entry),
+            None
+        )
+        assert entry is not None, (
+            'Проверьте, что запросы дольше `SLOW_QUERY_THRESHOLD_MS` попадают в журнал '
+            'вместе с адресом запроса'
+        )
+        assert 'in TitleViewSet' in entry, (
+            'Проверьте, что в журнале медленных запросов указано представление'
+        )
+        assert '%Поворот%' in entry, (
+            'Проверьте, что в журнале медленных запросов есть параметры SQL запроса'
+        )
+        assert 'plan:' in entry and 'reviews_title' in entry.split('plan:')[1], (
+            'Проверьте, что для медленного SELECT в журнал пишется план выполнения'
+        )
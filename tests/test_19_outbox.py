@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class FlakyBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+
+    def send_messages(self, messages):
+        if any('broken' in address for message in messages for address in message.to):
+            raise ConnectionError('Сервер отклонил письмо')
+        return super().send_messages(messages)
+
+
+class Test19Outbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_only_queues_email(self, client):
+        from reviews.models import OutboxEmail
+
+        outbox_before_count = len(mail.outbox)
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'queued@yamdb.fake', 'username': 'queued'
+        })
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при регистрации письмо не отправляется во время запроса'
+        )
+        assert OutboxEmail.objects.filter(to='queued@yamdb.fake').count() == 1, (
+            'Проверьте, что при регистрации письмо с кодом подтверждения попадает в очередь'
+        )
+
+        response = client.get('/metrics')
+        assert 'email_queue_depth 1' in response.content.decode(), (
+            'Проверьте, что `/metrics` показывает число писем в очереди'
+        )
+
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == ['queued@yamdb.fake']
+        assert not OutboxEmail.objects.exists(), (
+            'Проверьте, что отправленные письма удаляются из очереди'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_send_outbox_batches_and_retries(self, settings, monkeypatch):
+        import reviews.outbox
+        from reviews.models import OutboxEmail
+        from reviews.outbox import enqueue
+
+        settings.EMAIL_BACKEND = 'tests.test_19_outbox.FlakyBackend'
+        FlakyBackend.opened = 0
+        mail.outbox = []
+        for number in range(5):
+            enqueue('Код', str(number), 'from@yamdb.ru', f'user{number}@yamdb.fake')
+        enqueue('Код', 'broken', 'from@yamdb.ru', 'broken@yamdb.fake')
+
+        call_command('send_outbox', once=True, batch_size=4)
+        assert len(mail.outbox) == 5, (
+            'Проверьте, что `send_outbox` отправляет все письма из очереди'
+        )
+        assert FlakyBackend.opened == 2, (
+            'Проверьте, что `send_outbox` открывает одно соединение на пачку писем'
+        )
+        broken = OutboxEmail.objects.get()
+        assert broken.attempts == 1 and 'отклонил' in broken.last_error, (
+            'Проверьте, что неудачная отправка остаётся в очереди с текстом ошибки'
+        )
+        assert broken.send_after > timezone.now() + timedelta(seconds=20), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+
+        broken.send_after = timezone.now()
+        broken.save()
+        call_command('send_outbox', once=True)
+        broken.refresh_from_db()
+        assert broken.attempts == 2
+        assert broken.send_after > timezone.now() + timedelta(seconds=50), (
+            'Проверьте, что задержка перед повтором растёт с каждой попыткой'
+        )
+
+        monkeypatch.setattr(reviews.outbox, 'OUTBOX_MAX_ATTEMPTS', 2)
+        broken.send_after = timezone.now()
+        broken.save()
+        call_command('send_outbox', once=True)
+        broken.refresh_from_db()
+        assert broken.attempts == 2, (
+            'Проверьте, что после OUTBOX_MAX_ATTEMPTS попыток письмо больше не отправляется'
+        )
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Test20ConfirmationCodes:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_code_from_email_gives_token(self, client):
+        from reviews.models import OutboxEmail
+
+        data = {'username': 'coded', 'email': 'coded@yamdb.fake'}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+        ]
+        assert len(writes) == 2 and 'reviews_outboxemail' in writes[1], (
+            f'Проверьте, что при POST запросе `{self.url_signup}` в базу пишутся '
+            'только новый пользователь и письмо, без кода подтверждения'
+        )
+
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200, (
+            f'Проверьте, что повторный POST запрос `{self.url_signup}` с теми же '
+            'данными отправляет новый код'
+        )
+        assert OutboxEmail.objects.count() == 2
+
+        call_command('send_outbox', once=True)
+        code = mail.outbox[-1].body
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_token, data={
+                'username': 'coded', 'confirmation_code': code})
+        assert response.status_code == 200, (
+            f'Проверьте, что POST запрос `{self.url_token}` с кодом из письма '
+            'возвращает токен'
+        )
+        assert 'access' in response.json()
+        assert len(context.captured_queries) == 1, (
+            f'Проверьте, что POST запрос `{self.url_token}` проверяет код одним SQL запросом'
+        )
+        response = client.post(self.url_token, data={
+            'username': 'coded', 'confirmation_code': mail.outbox[0].body})
+        assert response.status_code == 200, (
+            'Проверьте, что прежний код тоже действует до истечения срока'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_foreign_expired_and_forged_codes(self, client, django_user_model, monkeypatch):
+        import api.tokens
+        from api.tokens import make_confirmation_code
+
+        first = django_user_model.objects.create(username='first', email='first@yamdb.fake')
+        second = django_user_model.objects.create(username='second', email='second@yamdb.fake')
+        code = make_confirmation_code(first.pk)
+        timestamp, signature = code.split('-')
+        invalid_codes = [
+            ('second', code),
+            ('first', make_confirmation_code(first.pk, int(time.time()) - 2 * 24 * 60 * 60)),
+            ('first', f'{timestamp}-{signature[::-1]}'),
+            ('first', 'zzzzzzzzzzzzzzzzzz-0'),
+            ('first', '0000'),
+        ]
+        for username, invalid_code in invalid_codes:
+            response = client.post(self.url_token, data={
+                'username': username, 'confirmation_code': invalid_code})
+            assert response.status_code == 400, (
+                f'Проверьте, что POST запрос `{self.url_token}` с чужим, просроченным '
+                'или поддельным кодом возвращает статус 400'
+            )
+        assert client.post(self.url_token, data={
+            'username': 'first', 'confirmation_code': code}).status_code == 200
+
+        monkeypatch.setattr(api.tokens, 'CONFIRMATION_CODE_TIMEOUT', 0)
+        response = client.post(self.url_token, data={
+            'username': second.username,
+            'confirmation_code': make_confirmation_code(second.pk, int(time.time()) - 1)})
+        assert response.status_code == 400, (
+            'Проверьте, что срок действия кода задаётся `CONFIRMATION_CODE_TIMEOUT`'
+        )
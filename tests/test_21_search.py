@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_titles
+
+
+def search(client, query):
+    response = client.get('/api/v1/titles/', {'search': query})
+    assert response.status_code == 200, (
+        'Проверьте, что GET запрос `/api/v1/titles/` с параметром `search` возвращает статус 200'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+class Test21Search:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Драма', 'year': 1999, 'category': 'films',
+            'description': 'Без поворотов'})
+
+        assert search(client, 'ворот') == ['Поворот туда', 'Драма'], (
+            'Проверьте, что `search` ищет по части названия и описания, '
+            'и совпадения в названии идут первыми'
+        )
+        assert search(client, 'ДРАМА ГОД') == ['Проект'], (
+            'Проверьте, что `search` не различает регистр и ищет все слова запроса'
+        )
+        assert search(client, 'ворот да') == ['Поворот туда'], (
+            'Проверьте, что `search` находит и слова короче трёх букв'
+        )
+        assert search(client, '"пике" OR NEAR(') == [], (
+            'Проверьте, что символы FTS5 в `search` ищутся как обычный текст'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Разворот', 'description': ''})
+        assert search(client, 'Поворот') == ['Драма'], (
+            'Проверьте, что поиск учитывает изменение произведения'
+        )
+        assert search(client, 'Развор') == ['Разворот']
+        admin_client.delete(url)
+        assert search(client, 'Развор') == [], (
+            'Проверьте, что удалённое произведение не находится поиском'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_loaded_titles_are_searchable(self, client):
+        call_command(
+            'generate_data', database=True, users=5, titles=30, genres=3,
+            categories=2, reviews_per_title=1, stdout=StringIO())
+        names = search(client, 'Произведение 17')
+        assert names[0] == 'Произведение 17', (
+            'Проверьте, что после `generate_data --database` поисковый индекс перестроен'
+        )
+        assert set(names) == {'Произведение 17'}
@@ -0,0 +1,99 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+URL = '/api/v1/autocomplete/'
+
+
+def autocomplete(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{URL}` возвращает статус 200'
+    )
+    return response.json()
+
+
+class Test22Autocomplete:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_prefix_lookup(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        tree_id = admin_client.post('/api/v1/titles/', data={
+            'name': 'Ёлка: «Поворот» зимой', 'year': 2001, 'category': 'films'}).json()['id']
+
+        assert autocomplete(client, q='пов') == {
+            'titles': [{'id': tree_id, 'name': 'Ёлка: «Поворот» зимой'},
+                       {'id': titles[0]['id'], 'name': 'Поворот туда'}],
+            'genres': [],
+            'categories': [],
+        }, (
+            f'Проверьте, что `{URL}` находит произведения, жанры и категории по началу названия'
+        )
+        assert autocomplete(client, q='ТУД', type='titles') == {
+            'titles': [{'id': titles[0]['id'], 'name': 'Поворот туда'}]
+        }, (
+            f'Проверьте, что `{URL}` находит название по началу любого слова без учёта регистра'
+        )
+        assert autocomplete(client, q='елка поворот зи', type='titles')['titles'] == [
+            {'id': tree_id, 'name': 'Ёлка: «Поворот» зимой'}
+        ], (
+            f'Проверьте, что `{URL}` не различает «е» и «ё» и пропускает знаки препинания'
+        )
+        assert autocomplete(client, q='к', type=['genres', 'categories']) == {
+            'genres': [{'name': 'Комедия', 'slug': 'comedy'}],
+            'categories': [{'name': 'Книги', 'slug': 'books'}],
+        }
+        assert len(autocomplete(client, q='п', limit=1)['titles']) == 1, (
+            f'Проверьте, что `{URL}` возвращает не больше `limit` вариантов'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            autocomplete(client, q='дра')
+        assert not context.captured_queries, (
+            f'Проверьте, что `{URL}` отвечает из индекса в памяти, без запросов к базе'
+        )
+
+        for params in ({'q': 'пов', 'type': 'users'}, {'q': 'пов', 'limit': 0},
+                       {'q': 'пов', 'limit': 'много'}):
+            response = client.get(URL, params)
+            assert response.status_code == 400, (
+                f'Проверьте, что GET запрос `{URL}` с неверными `type` или `limit` '
+                'возвращает статус 400'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_index_follows_changes(self, client, admin_client):
+        from api.cache import bump_versions
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        assert autocomplete(client, q='проект')['titles']
+
+        long_name = 'Очень длинное название произведения для проверки подсказок'
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'name': long_name})
+        with CaptureQueriesContext(connection) as context:
+            found = autocomplete(client, q='очень длинное название произведения для')
+        assert found['titles'] == [{'id': titles[1]['id'], 'name': long_name}], (
+            f'Проверьте, что изменённое название сразу находится через `{URL}`'
+        )
+        assert not context.captured_queries, (
+            'Проверьте, что изменения применяются к индексу без его перестроения'
+        )
+        assert autocomplete(client, q='проект')['titles'] == []
+        assert autocomplete(client, q='очень длинное название произведения для опыта')['titles'] == []
+
+        admin_client.delete('/api/v1/genres/drama/')
+        assert autocomplete(client, q='драма')['genres'] == [], (
+            f'Проверьте, что удалённый жанр не находится через `{URL}`'
+        )
+
+        # Another process renames a title: only the version scope tells.
+        Title.objects.filter(pk=titles[0]['id']).update(name='Разворот')
+        bump_versions('autocomplete:reviews.title')
+        assert autocomplete(client, q='развор')['titles'] == [
+            {'id': titles[0]['id'], 'name': 'Разворот'}
+        ], (
+            f'Проверьте, что `{URL}` перестраивает индекс после изменений в другом процессе'
+        )
@@ -0,0 +1,63 @@
+import pytest
+
+from .common import create_titles
+
+URL = '/api/v1/titles/'
+
+
+def facets(client, **params):
+    response = client.get(URL, {'facets': 'true', **params})
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{URL}?facets=true` возвращает статус 200'
+    )
+    return response.json()['facets']
+
+
+class Test23Facets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_facet_counts(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post(URL, data={
+            'name': 'Драма', 'year': 1999, 'category': 'films', 'genre': ['drama']})
+
+        assert facets(client) == {
+            'genre': [{'slug': 'drama', 'name': 'Драма', 'count': 2},
+                      {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+                      {'slug': 'horror', 'name': 'Ужасы', 'count': 1}],
+            'category': [{'slug': 'films', 'name': 'Фильм', 'count': 2},
+                         {'slug': 'books', 'name': 'Книги', 'count': 1}],
+            'year': [{'from': 1990, 'to': 1999, 'count': 1},
+                     {'from': 2000, 'to': 2009, 'count': 1},
+                     {'from': 2020, 'to': 2029, 'count': 1}],
+        }, (
+            f'Проверьте, что `{URL}?facets=true` возвращает число произведений '
+            'по жанрам, категориям и десятилетиям'
+        )
+        assert 'facets' not in client.get(URL).json(), (
+            'Проверьте, что подсчёты возвращаются только с параметром `facets`'
+        )
+
+        found = facets(client, category='films', genre='drama')
+        assert found['genre'] == [{'slug': 'drama', 'name': 'Драма', 'count': 1}], (
+            'Проверьте, что подсчёты учитывают фильтры запроса'
+        )
+        assert found['year'] == [{'from': 1990, 'to': 1999, 'count': 1}]
+        assert facets(client, year=2021) == {'genre': [], 'category': [], 'year': []}
+        assert facets(client, name='Про')['category'] == [
+            {'slug': 'books', 'name': 'Книги', 'count': 1}
+        ], (
+            'Проверьте, что подсчёты учитывают фильтр по названию'
+        )
+
+        admin_client.patch(f'{URL}{titles[0]["id"]}/', data={'year': 1995})
+        assert facets(client)['year'] == [
+            {'from': 1990, 'to': 1999, 'count': 2},
+            {'from': 2020, 'to': 2029, 'count': 1},
+        ], (
+            'Проверьте, что подсчёты обновляются после изменения произведения'
+        )
+        admin_client.delete('/api/v1/genres/drama/')
+        assert [genre['slug'] for genre in facets(client)['genre']] == ['comedy', 'horror'], (
+            'Проверьте, что подсчёты обновляются после удаления жанра'
+        )
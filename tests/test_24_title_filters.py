@@ -0,0 +1,92 @@
+import re
+from itertools import combinations
+
+import pytest
+from django.http import QueryDict
+
+from .common import create_reviews, create_titles
+
+URL = '/api/v1/titles/'
+FILTERS = {
+    'genre': 'drama,comedy', 'category': 'films,books', 'year': '2000',
+    'year_min': '1990', 'year_max': '2010', 'rating_min': '5',
+    'rating_max': '8',
+}
+# Subquery tables show up under Django's aliases (U0, U1), so any table
+# read without an index counts.
+FULL_SCAN = re.compile(r'^\s*SCAN \w+$')
+
+
+def names(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `{URL}` с фильтрами возвращает статус 200'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+class Test24TitleFilters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_multi_value_and_range_filters(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(URL, data={
+            'name': 'Драма', 'year': 1985, 'category': 'books', 'genre': ['drama', 'comedy']})
+
+        assert names(client, genre='drama,comedy') == ['Драма', 'Проект', 'Поворот туда'], (
+            'Проверьте, что `genre` принимает несколько жанров через запятую '
+            'и возвращает каждое произведение один раз'
+        )
+        assert names(client, genre='horror') == ['Поворот туда']
+        assert names(client, category='films,books') == ['Драма', 'Проект', 'Поворот туда'], (
+            'Проверьте, что `category` принимает несколько категорий через запятую'
+        )
+        assert names(client, year_min=1990, year_max=2010) == ['Поворот туда'], (
+            'Проверьте фильтрацию по `year_min` и `year_max`'
+        )
+        assert names(client, year_min=2000) == ['Проект', 'Поворот туда']
+        rating = client.get(f'{URL}{titles[0]["id"]}/').json()['rating']
+        assert names(client, rating_min=rating) == ['Поворот туда'], (
+            'Проверьте фильтрацию по `rating_min` и `rating_max`'
+        )
+        assert names(client, rating_max=rating - 1) == []
+        assert names(client, ordering='year') == ['Драма', 'Поворот туда', 'Проект'], (
+            'Проверьте, что `ordering` сортирует произведения'
+        )
+        assert names(client, ordering='-name', category='books') == ['Проект', 'Драма']
+        response = client.get(URL, {'year_min': 'давно'})
+        assert response.status_code == 400, (
+            'Проверьте, что неверное значение фильтра возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_filters_use_indexes(self):
+        from api.filters import TitleFilter
+        from api.slow_queries import explain
+        from api.views import TitleViewSet
+
+        for size in range(1, len(FILTERS) + 1):
+            for names_ in combinations(FILTERS, size):
+                params = QueryDict('&'.join(f'{name}={FILTERS[name]}' for name in names_))
+                queryset = TitleFilter(params, queryset=TitleViewSet.queryset).qs
+                # The paginator's COUNT(*) reads every matching title, with
+                # no LIMIT to stop early.
+                sql, query_params = queryset.order_by().values('pk').query.sql_with_params()
+                plan = explain('default', f'SELECT COUNT(*) FROM ({sql})', query_params)
+                assert not any(FULL_SCAN.match(line) for line in plan.splitlines()), (
+                    f'Проверьте, что фильтры {", ".join(names_)} используют индексы:\n{plan}'
+                )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_filter_count_follows_reviews(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'{URL}{titles[1]["id"]}/reviews/'
+        review = admin_client.post(reviews_url, data={'text': 'Отлично', 'score': 9}).json()
+        assert admin_client.get(URL, {'rating_min': 8}).json()['count'] == 1
+
+        admin_client.patch(f'{reviews_url}{review["id"]}/', data={'score': 1})
+        data = admin_client.get(URL, {'rating_min': 8}).json()
+        assert (data['count'], data['results']) == (0, []), (
+            'Проверьте, что число произведений в фильтре по `rating_min` '
+            'обновляется при изменении оценки'
+        )